@@ -66,18 +66,78 @@ DATABASES = {
         'PASSWORD': os.getenv("DB_PASSWORD"),
         'HOST': os.getenv("DB_HOST"),
         'PORT': os.getenv("DB_PORT"),
+        # Reuse each worker's connection across requests, pinging it before reuse. Under ASGI every
+        # sync_to_async thread would keep its own connection open, so persistence is opt-in there.
+        'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", "0" if os.getenv("WEB_SERVER") == "asgi" else "60")),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read-only MariaDB replicas for API reads, e.g. DB_REPLICA_HOSTS=replica1,replica2.
+for index, host in enumerate(filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), start=1):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['news.replicas.ReplicaRouter']
+
+NEWS_DB_REPLICAS = {
+    'ALIASES': [alias for alias in DATABASES if alias.startswith('replica')],
+    'STICKY_SECONDS': int(os.getenv("DB_REPLICA_STICKY_SECONDS", "5")),
+    'RETRY_SECONDS': 30,
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv("CACHE_URL", "redis://redis:6379/1"),
+    },
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+NEWS_RESPONSE_CACHE = {
+    'ALIAS': 'default',
+    'FALLBACK_ALIAS': 'local',
+    'TIMEOUT': 300,
+}
+
+# Long-poll/SSE clients of /api/news/changes/ are woken over Redis pub/sub.
+NEWS_CHANGE_FEED = {
+    'REDIS_URL': os.getenv("CHANGE_FEED_URL", "redis://redis:6379/3"),
+    'CHANNEL': 'news:changes',
+    'TIMEOUT': 25,
+    'MAX_TIMEOUT': 55,
+    'POLL_INTERVAL': 2.0,
+    # Outbox rows behind an id gap wait this long for the gap to commit; covers clock skew between hosts.
+    'GAP_GRACE': 2.0,
+}
+
 if 'test' in sys.argv:
-    DATABASES['default'] = {
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': os.getenv("TDB_NAME"),
-        'USER': os.getenv("DB_USER"),
-        'PASSWORD': os.getenv("DB_PASSWORD"),
-        'HOST': os.getenv("DB_HOST"),
-        'PORT': os.getenv("DB_PORT"),
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.mysql',
+            'NAME': os.getenv("TDB_NAME"),
+            'USER': os.getenv("DB_USER"),
+            'PASSWORD': os.getenv("DB_PASSWORD"),
+            'HOST': os.getenv("DB_HOST"),
+            'PORT': os.getenv("DB_PORT"),
+        },
     }
+    # A separate database standing in for a replica; only the routing tests read from it.
+    DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'NAME': f'{os.getenv("TDB_NAME")}_replica'}}
+    NEWS_DB_REPLICAS = {**NEWS_DB_REPLICAS, 'ALIASES': []}
+    NEWS_CHANGE_FEED = {**NEWS_CHANGE_FEED, 'REDIS_URL': None, 'POLL_INTERVAL': 0.05}
+    CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test'},
+        'local': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-local'},
+    }
+    # InnoDB only indexes FULLTEXT changes on commit, which never happens inside TestCase transactions.
+    NEWS_SEARCH_BACKEND = 'news.search.BasicSearchBackend'
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -110,10 +170,48 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
 
+SCRAPER_BROWSER_POOL = {
+    'ENABLED': os.getenv("SCRAPER_BROWSER_POOL", "1") == "1",
+    'EXECUTABLE_PATH': os.getenv("PLAYWRIGHT_EXECUTABLE_PATH"),
+    'MAX_PAGES': 500,
+    'MAX_RSS_MB': 1024,
+    'STARTUP_TIMEOUT': 30,
+}
+
+SCRAPER_THROUGHPUT_PROFILE = os.getenv("SCRAPER_THROUGHPUT_PROFILE", "balanced")
+
+# 'fork' runs each crawl in a child process of the Celery worker; 'worker' only
+# queues it for the long-running `manage.py run_crawler_worker`.
+SCRAPER_CRAWLER = {
+    'MODE': os.getenv("SCRAPER_CRAWLER_MODE", "fork"),
+    'REDIS_URL': os.getenv("CRAWL_QUEUE_URL", "redis://redis:6379/2"),
+    'RESULT_TTL': 3600,
+}
+
+SCRAPER_SCHEDULE = {
+    'CACHE_ALIAS': 'default',
+    # Run locks use this Redis directly, for atomic token-checked renew/release.
+    'LOCK_URL': os.getenv("CACHE_URL", "redis://redis:6379/1"),
+    'LEASE_SECONDS': 300,
+    'HEARTBEAT_SECONDS': 60,
+    'MIN_INTERVAL': 60,
+    'MAX_INTERVAL': 3600,
+    'BACKOFF_FACTOR': 2.0,
+}
+
+if 'test' in sys.argv:
+    SCRAPER_SCHEDULE['LOCK_URL'] = None
+
+# Names from scraper.sources to crawl; empty means every registered source.
+SCRAPER_SOURCES = [name for name in os.getenv("SCRAPER_SOURCES", "").split(",") if name]
+
+CELERY_TASK_ROUTES = {
+    'news.tasks.scrape_news_task': {'queue': 'scraping'},
+}
 
 CELERY_BEAT_SCHEDULE = {
     'scrape-news-every-hour': {
-        'task': 'news.tasks.scrape_news_task',
+        'task': 'news.tasks.scrape_sources_task',
         'schedule': 60,
     },
 }
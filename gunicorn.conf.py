@@ -0,0 +1,16 @@
+import os
+
+# WEB_SERVER=asgi serves TakNews.asgi on uvicorn workers, where the
+# /api/async/ endpoints await the database instead of blocking a worker.
+# The default is the sync WSGI app. Worker count comes from WEB_CONCURRENCY.
+WEB_SERVERS = {
+    'wsgi': ('TakNews.wsgi:application', 'sync'),
+    'asgi': ('TakNews.asgi:application', 'uvicorn_worker.UvicornWorker'),
+}
+
+web_server = os.getenv('WEB_SERVER', 'wsgi')
+if web_server not in WEB_SERVERS:
+    raise ValueError(f"WEB_SERVER must be one of {sorted(WEB_SERVERS)}, got {web_server!r}")
+
+wsgi_app, worker_class = WEB_SERVERS[web_server]
+bind = os.getenv('WEB_BIND', '0.0.0.0:8000')
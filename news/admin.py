@@ -8,7 +8,7 @@ from .models import News, Tag
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-    list_display = ('name', 'slug')
+    list_display = ('name', 'slug', 'news_count')
     search_fields = ('name',)
     prepopulated_fields = {'slug': ('name',)}
 
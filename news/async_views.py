@@ -0,0 +1,177 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Max
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from .cache import response_cache
+from .changes import change_feed, visible_changes
+from .models import News, NewsChange
+from .replicas import replicas
+from .renderers import NewsJSONRenderer
+from .serializers import NewsRowSerializer
+from .views import NewsQueryMixin
+
+
+class NewsAsyncView(NewsQueryMixin, View):
+    """Read-only ``NewsAPIView`` on Django's async ORM, for ASGI deployments.
+
+    Takes the same query parameters and returns the same JSON, but awaits
+    its queries instead of holding a worker while the database answers.
+    Under a sync (WSGI) server Django runs it in a thread like any other
+    view, so it stays correct there too.
+    """
+
+    renderer = NewsJSONRenderer()
+
+    async def get(self, request, pk=None):
+        request = Request(request)
+        lookup = await sync_to_async(response_cache.lookup)(request)
+        if lookup.data is not None:
+            if lookup.is_not_modified(request):
+                return await sync_to_async(lookup.finalize)(HttpResponse(status=status.HTTP_304_NOT_MODIFIED), 'NOT_MODIFIED')
+            return await sync_to_async(lookup.finalize)(self.render(lookup.data), 'HIT')
+
+        alias = await sync_to_async(replicas.choose)(request, lookup.last_modified)
+        try:
+            with replicas.reading_from(alias):
+                data, status_code = await self.build_data(request, pk)
+        except APIException as exc:
+            response = exception_handler(exc, {})
+            data, status_code = response.data, response.status_code
+        if status_code == status.HTTP_200_OK:
+            await sync_to_async(lookup.store)(data)
+            if lookup.is_not_modified(request):
+                return await sync_to_async(lookup.finalize)(HttpResponse(status=status.HTTP_304_NOT_MODIFIED), 'NOT_MODIFIED')
+        response = self.render(data, status_code)
+        response['X-DB-Alias'] = alias
+        return await sync_to_async(lookup.finalize)(response, 'MISS')
+
+    async def build_data(self, request, pk=None):
+        row_serializer = NewsRowSerializer(self.get_fields(request, detail=bool(pk)))
+        if pk:
+            try:
+                row = await row_serializer.rows(self.get_queryset()).aget(pk=pk)
+            except News.DoesNotExist:
+                return {'error': 'News not found'}, status.HTTP_404_NOT_FOUND
+            return (await row_serializer.ato_representation([row]))[0], status.HTTP_200_OK
+
+        rows, paginator = self.list_rows(request, row_serializer)
+        page = await paginator.apaginate_queryset(rows, request)
+        if page is not None:
+            data = await row_serializer.ato_representation(page)
+            return paginator.get_paginated_response(data).data, status.HTTP_200_OK
+        return await row_serializer.ato_representation(rows), status.HTTP_200_OK
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(self.renderer.render(data), status=status_code, content_type='application/json')
+
+
+class NewsChangesView(NewsQueryMixin, View):
+    """Articles that became visible after a cursor, by long-poll or Server-Sent Events.
+
+    The cursor is a ``NewsChange`` outbox id. ``?after=<cursor>`` returns
+    the active articles recorded after it, in commit order, as
+    ``{"cursor": ..., "results": [...]}``. When there are none yet
+    the request waits up to ``?timeout=`` seconds for the next scrape to
+    commit. Without ``after`` it answers at once with the current cursor.
+    ``Accept: text/event-stream`` streams the same feed as SSE, resuming
+    from ``Last-Event-ID``.
+
+    Waiting only costs nothing under ASGI. Under WSGI every waiting client
+    would pin a sync worker, and Django buffers async streams there until
+    they end, so long-polls answer at once and SSE is refused with 406.
+    """
+
+    renderer = NewsJSONRenderer()
+    keepalive = 15
+    max_limit = 100
+
+    async def get(self, request):
+        options = getattr(settings, 'NEWS_CHANGE_FEED', {})
+        try:
+            after = request.GET.get('after') or request.headers.get('Last-Event-ID')
+            after = int(after) if after else None
+            timeout = float(request.GET.get('timeout', options.get('TIMEOUT', 25)))
+            timeout = min(max(timeout, 0), options.get('MAX_TIMEOUT', 55))
+            limit = min(max(int(request.GET.get('limit', self.max_limit)), 1), self.max_limit)
+        except ValueError:
+            return JsonResponse({'error': 'after and limit must be integers, timeout a number of seconds'}, status=400)
+
+        stream = 'text/event-stream' in request.headers.get('Accept', '')
+        if not isinstance(request, ASGIRequest):
+            if stream:
+                return JsonResponse({'error': 'Event streams are only served by the ASGI server mode'}, status=406)
+            timeout = 0
+
+        row_serializer = NewsRowSerializer(self.get_fields(request, detail=False))
+        if after is None:
+            after = (await NewsChange.objects.aaggregate(cursor=Max('id')))['cursor'] or 0
+            if not stream:
+                return self.render({'cursor': after, 'results': []})
+
+        if stream:
+            response = StreamingHttpResponse(self.events(row_serializer, after, limit), content_type='text/event-stream')
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'
+            return response
+        items, cursor = await self.changes(row_serializer, after, limit, timeout)
+        return self.render({'cursor': cursor, 'results': items})
+
+    async def changes(self, row_serializer, after, limit, timeout):
+        grace = getattr(settings, 'NEWS_CHANGE_FEED', {}).get('GAP_GRACE', 2.0)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        event = None
+        try:
+            while True:
+                items, after, held_back = await self.fetch(row_serializer, after, limit, grace)
+                remaining = deadline - loop.time()
+                if items or remaining <= 0:
+                    return items, after
+                if event is None:
+                    # Only requests that will wait subscribe; check once more so no publish is missed.
+                    event = change_feed.waiter()
+                    continue
+                # Changes held back behind a gap are released after ``grace`` at the latest.
+                await change_feed.wait(event, min(remaining, grace) if held_back else remaining)
+        finally:
+            if event is not None:
+                change_feed.discard(event)
+
+    async def fetch(self, row_serializer, after, limit, grace):
+        """Active articles from the outbox rows visible after ``after``, the new cursor, and whether any were held back."""
+        outbox = NewsChange.objects.order_by('id').values_list('id', 'news_id', 'created_at')
+        while True:
+            pending = [change async for change in outbox.filter(id__gt=after)[:limit]]
+            visible = visible_changes(pending, after, timezone.now(), grace)
+            if not visible:
+                return [], after, bool(pending)
+            after = visible[-1][0]
+            news_ids = list(dict.fromkeys(news_id for _, news_id in visible))
+            rows = {
+                row['id']: row
+                async for row in row_serializer.rows(News.objects.filter(id__in=news_ids, is_active=True))
+            }
+            if rows:
+                return await row_serializer.ato_representation([rows[i] for i in news_ids if i in rows]), after, False
+
+    async def events(self, row_serializer, after, limit):
+        yield b'retry: 2000\n\n'
+        while True:
+            items, after = await self.changes(row_serializer, after, limit, self.keepalive)
+            if items:
+                yield b'id: %d\nevent: news\ndata: %b\n\n' % (after, self.renderer.render(items))
+            else:
+                yield b': keepalive\n\n'
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(self.renderer.render(data), status=status_code, content_type='application/json')
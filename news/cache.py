@@ -0,0 +1,132 @@
+import hashlib
+import logging
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import http_date, parse_http_date_safe
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = 'news:generation'
+MODIFIED_KEY = 'news:generation:modified'
+HITS_KEY = 'news:cache:hits'
+MISSES_KEY = 'news:cache:misses'
+NOT_MODIFIED_KEY = 'news:cache:not_modified'
+
+
+class CacheLookup:
+    def __init__(self, cache, key, etag, last_modified, data):
+        self.cache = cache
+        self.key = key
+        self.etag = etag
+        self.last_modified = last_modified
+        self.data = data
+
+    def is_not_modified(self, request):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or self.etag in tags
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return if_modified_since is not None and int(self.last_modified) <= if_modified_since
+
+    def store(self, data):
+        self.cache.set(self.key, data)
+
+    def finalize(self, response, state):
+        # Validators describe the cached 200 representation; errors must not carry them.
+        if response.status_code in (200, 304):
+            response['ETag'] = self.etag
+            response['Last-Modified'] = http_date(self.last_modified)
+        response['X-Cache'] = state
+        self.cache.incr({'HIT': HITS_KEY, 'MISS': MISSES_KEY}.get(state, NOT_MODIFIED_KEY))
+        return response
+
+
+class NewsResponseCache:
+    """Read-through cache for ``NewsAPIView`` GET responses.
+
+    Keys embed a global generation counter, so any write just bumps the
+    counter and every older entry becomes unreachable and ages out. When
+    the shared (Redis) cache is unreachable the local LRU alias is used.
+    """
+
+    def __init__(self, alias='default', fallback_alias='local', timeout=300):
+        self.alias = alias
+        self.fallback_alias = fallback_alias
+        self.timeout = timeout
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'NEWS_RESPONSE_CACHE', {})
+        return cls(
+            alias=options.get('ALIAS', 'default'),
+            fallback_alias=options.get('FALLBACK_ALIAS', 'local'),
+            timeout=options.get('TIMEOUT', 300),
+        )
+
+    def _call(self, method, *args, **kwargs):
+        try:
+            return getattr(caches[self.alias], method)(*args, **kwargs)
+        except ValueError:
+            raise
+        except Exception as e:
+            if self.fallback_alias is None or self.fallback_alias == self.alias:
+                raise
+            logger.warning(f"Response cache '{self.alias}' unavailable, using '{self.fallback_alias}': {e}")
+            return getattr(caches[self.fallback_alias], method)(*args, **kwargs)
+
+    def get(self, key):
+        return self._call('get', key)
+
+    def set(self, key, value):
+        self._call('set', key, value, self.timeout)
+
+    def incr(self, key):
+        try:
+            return self._call('incr', key)
+        except ValueError:
+            self._call('add', key, 0, None)
+            return self._call('incr', key)
+
+    def generation(self):
+        values = self._call('get_many', [GENERATION_KEY, MODIFIED_KEY])
+        if GENERATION_KEY not in values:
+            self._call('add', GENERATION_KEY, 1, None)
+            self._call('add', MODIFIED_KEY, time.time(), None)
+            values = self._call('get_many', [GENERATION_KEY, MODIFIED_KEY])
+        return values.get(GENERATION_KEY, 1), values.get(MODIFIED_KEY, time.time())
+
+    def bump(self):
+        generation = self.incr(GENERATION_KEY)
+        self._call('set', MODIFIED_KEY, time.time(), None)
+        return generation
+
+    def lookup(self, request):
+        generation, last_modified = self.generation()
+        query = urlencode(sorted(request.GET.lists()), doseq=True)
+        digest = hashlib.sha1(f'{request.get_host()}{request.path}?{query}'.encode('utf-8')).hexdigest()
+        key = f'news:response:{generation}:{digest}'
+        etag = f'"{generation}-{digest[:16]}"'
+        return CacheLookup(self, key, etag, last_modified, self.get(key))
+
+    def stats(self):
+        values = self._call('get_many', [HITS_KEY, MISSES_KEY, NOT_MODIFIED_KEY, GENERATION_KEY])
+        return {
+            'hits': values.get(HITS_KEY, 0),
+            'misses': values.get(MISSES_KEY, 0),
+            'not_modified': values.get(NOT_MODIFIED_KEY, 0),
+            'generation': values.get(GENERATION_KEY, 1),
+        }
+
+
+response_cache = NewsResponseCache.from_settings()
+
+
+def bump_generation(*args, **kwargs):
+    try:
+        response_cache.bump()
+    except Exception as e:
+        logger.error(f"Could not invalidate news response cache: {e}")
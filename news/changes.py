@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import weakref
+from datetime import timedelta
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.db import transaction
+
+from .models import NewsChange
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeListener:
+    """One Redis subscription per event loop, shared by every waiting client.
+
+    Each message on the channel wakes all current waiters; they re-query
+    the database themselves, so the payload carries no data.
+    """
+
+    def __init__(self, feed):
+        self.feed = feed
+        self.waiters = set()
+        self.connected = False
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def run(self):
+        while True:
+            client = redis.asyncio.Redis.from_url(self.feed.url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.feed.channel)
+                    self.connected = True
+                    logger.info(f"Change feed listening on '{self.feed.channel}'")
+                    async for message in pubsub.listen():
+                        if message['type'] == 'message':
+                            self.wake()
+            except (redis.RedisError, OSError) as e:
+                if self.connected:
+                    logger.warning(f"Change feed lost Redis, polling every {self.feed.poll_interval}s: {e}")
+                self.connected = False
+                self.wake()
+                await asyncio.sleep(self.feed.poll_interval)
+            finally:
+                await client.aclose()
+
+    def wake(self):
+        for event in self.waiters:
+            event.set()
+
+
+class ChangeFeed:
+    """Wakes long-polling and SSE clients of the news change feed.
+
+    Writers call ``publish`` after new articles commit, and every worker
+    process forwards the message to its waiting clients through a single
+    ``ChangeListener``. Without Redis (``REDIS_URL`` unset or unreachable)
+    waiters fall back to re-checking every ``POLL_INTERVAL`` seconds.
+    """
+
+    def __init__(self, url=None, channel='news:changes', poll_interval=2.0):
+        self.url = url
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self._client = None
+        self._listeners = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'NEWS_CHANGE_FEED', {})
+        return cls(
+            url=options.get('REDIS_URL'),
+            channel=options.get('CHANNEL', 'news:changes'),
+            poll_interval=options.get('POLL_INTERVAL', 2.0),
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url, socket_connect_timeout=1, socket_timeout=1)
+        return self._client
+
+    def publish(self):
+        if not self.url:
+            return
+        try:
+            self.client.publish(self.channel, b'1')
+        except redis.RedisError as e:
+            logger.warning(f"Could not publish to the change feed: {e}")
+
+    def listener(self):
+        loop = asyncio.get_running_loop()
+        listener = self._listeners.get(loop)
+        if listener is None:
+            listener = self._listeners[loop] = ChangeListener(self)
+        return listener
+
+    def waiter(self):
+        """An event set on the next change; register it before checking the database so no publish is missed."""
+        event = asyncio.Event()
+        if self.url:
+            self.listener().waiters.add(event)
+        return event
+
+    async def wait(self, event, timeout):
+        """Waits up to ``timeout`` seconds for ``event``, or one poll interval when Redis is not connected."""
+        listener = self._listeners.get(asyncio.get_running_loop()) if self.url else None
+        if listener is None or not listener.connected:
+            timeout = min(timeout, self.poll_interval)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            event.clear()
+
+    def discard(self, event):
+        listener = self._listeners.get(asyncio.get_running_loop())
+        if listener is not None:
+            listener.waiters.discard(event)
+
+    async def close(self):
+        listener = self._listeners.pop(asyncio.get_running_loop(), None)
+        if listener is not None:
+            listener.task.cancel()
+            await asyncio.gather(listener.task, return_exceptions=True)
+
+
+change_feed = ChangeFeed.from_settings()
+
+
+def record_changes(news_ids):
+    """Appends ``news_ids`` to the ``NewsChange`` outbox and wakes the feed; call it after commit."""
+    if news_ids:
+        NewsChange.objects.bulk_create([NewsChange(news_id=news_id) for news_id in news_ids])
+        change_feed.publish()
+
+
+def record_changes_on_commit(news_ids):
+    news_ids = list(news_ids)
+    if news_ids:
+        transaction.on_commit(lambda: record_changes(news_ids))
+
+
+def visible_changes(changes, after, now, grace):
+    """The leading ``(id, news_id)`` pairs of ``changes`` that can be emitted without skipping a commit.
+
+    ``changes`` are ``(id, news_id, created_at)`` outbox rows after cursor
+    ``after``, in id order. A gap in the ids may be an insert that has taken
+    its id but not committed yet, so rows behind a gap are held back until
+    they are ``grace`` old. By then the gap can only be a rolled-back or
+    skipped id.
+    """
+    visible = []
+    expected = after + 1
+    for change_id, news_id, created_at in changes:
+        if change_id != expected and created_at > now - timedelta(seconds=grace):
+            break
+        visible.append((change_id, news_id))
+        expected = change_id + 1
+    return visible
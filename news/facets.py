@@ -0,0 +1,125 @@
+import datetime
+from collections import Counter
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .models import News, Tag, TagActivity
+
+TRENDING_WINDOWS = {
+    'last_24h': timedelta(hours=24),
+    'last_7d': timedelta(days=7),
+}
+UPDATE_BATCH_SIZE = 100
+
+
+def activity_hour(moment):
+    return moment.astimezone(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def contributions(pairs, sign=1):
+    """``(tag_id, hour)`` -> ``sign`` for every ``(tag_id, published_at)`` pair of an active article."""
+    deltas = Counter()
+    for tag_id, published_at in pairs:
+        deltas[tag_id, activity_hour(published_at)] += sign
+    return deltas
+
+
+def news_contributions(news_ids, sign=1):
+    """``contributions`` of the active articles in ``news_ids`` as currently tagged in the database."""
+    return contributions(
+        News.tags.through.objects.filter(news__in=news_ids, news__is_active=True)
+        .values_list('tag_id', 'news__published_at'),
+        sign,
+    )
+
+
+def grouped_by_delta(deltas):
+    groups = {}
+    for key, delta in deltas.items():
+        if delta:
+            groups.setdefault(delta, []).append(key)
+    for delta, keys in groups.items():
+        for start in range(0, len(keys), UPDATE_BATCH_SIZE):
+            yield delta, keys[start:start + UPDATE_BATCH_SIZE]
+
+
+def apply_deltas(deltas):
+    """Adds ``(tag_id, hour)`` deltas to ``TagActivity`` and ``Tag.news_count``.
+
+    Keys sharing a delta (usually +1) are updated by one ``UPDATE ... SET
+    count = count + n``, so a scraped batch costs a handful of queries and
+    concurrent writers never overwrite each other's counts.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    with transaction.atomic(savepoint=False):
+        TagActivity.objects.bulk_create(
+            [TagActivity(tag_id=tag_id, hour=hour) for tag_id, hour in deltas], ignore_conflicts=True,
+        )
+        for delta, keys in grouped_by_delta(deltas):
+            TagActivity.objects.filter(
+                reduce(or_, (Q(tag_id=tag_id, hour=hour) for tag_id, hour in keys))
+            ).update(count=F('count') + delta)
+
+        per_tag = Counter()
+        for (tag_id, _), delta in deltas.items():
+            per_tag[tag_id] += delta
+        for delta, tag_ids in grouped_by_delta(per_tag):
+            Tag.objects.filter(id__in=tag_ids).update(news_count=F('news_count') + delta)
+
+
+def tag_facets(now=None, windows=TRENDING_WINDOWS):
+    """Every tag with its article count and per-window counts, from the aggregates only.
+
+    Windows are counted in whole hours, so ``last_24h`` can include up to
+    one extra partial hour.
+    """
+    now = now or timezone.now()
+    starts = {name: activity_hour(now - span) for name, span in windows.items()}
+    trending = {
+        row.pop('tag'): row
+        for row in TagActivity.objects.filter(hour__gte=min(starts.values()))
+        .values('tag')
+        .annotate(**{name: Sum('count', filter=Q(hour__gte=start)) for name, start in starts.items()})
+    }
+    facets = []
+    for tag in Tag.objects.values('id', 'name', 'slug', 'news_count'):
+        counts = trending.get(tag['id'], {})
+        facets.append({
+            'id': tag['id'],
+            'name': tag['name'],
+            'slug': tag['slug'],
+            'count': tag['news_count'],
+            **{name: counts.get(name) or 0 for name in windows},
+        })
+    return facets
+
+
+def rebuild_tag_facets():
+    """Recomputes every aggregate from the news table; returns the tags whose count changed."""
+    with transaction.atomic():
+        deltas = contributions(
+            News.tags.through.objects.filter(news__is_active=True)
+            .values_list('tag_id', 'news__published_at').iterator(chunk_size=5000)
+        )
+        per_tag = Counter()
+        for (tag_id, _), count in deltas.items():
+            per_tag[tag_id] += count
+
+        TagActivity.objects.all().delete()
+        TagActivity.objects.bulk_create(
+            [TagActivity(tag_id=tag_id, hour=hour, count=count) for (tag_id, hour), count in deltas.items()],
+            batch_size=1000,
+        )
+        tags = list(Tag.objects.only('id', 'news_count'))
+        changed = [tag for tag in tags if tag.news_count != per_tag.get(tag.id, 0)]
+        for tag in changed:
+            tag.news_count = per_tag.get(tag.id, 0)
+        Tag.objects.bulk_update(changed, ['news_count'], batch_size=1000)
+    return changed
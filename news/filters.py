@@ -1,6 +1,6 @@
 import django_filters
-from django.db.models import Q
 from .models import News
+from .search import get_search_backend
 
 
 class NewsFilter(django_filters.FilterSet):
@@ -17,16 +17,8 @@ class NewsFilter(django_filters.FilterSet):
         return queryset.filter(tags__name__in=tag)
 
     def filter_include_keyword(self, queryset, name, value):
-        keywords = value.split()
-        query = Q()
-        for keyword in keywords:
-            query |= Q(title__icontains=keyword) | Q(content__icontains=keyword)
-        return queryset.filter(query)
+        return get_search_backend(queryset.db).filter(queryset, value)
 
     def filter_exclude_keyword(self, queryset, name, value):
-        keywords = value.split()
-        query = Q()
-        for keyword in keywords:
-            query |= Q(title__icontains=keyword) | Q(content__icontains=keyword)
-        return queryset.exclude(query)
+        return get_search_backend(queryset.db).exclude(queryset, value)
 
@@ -0,0 +1,96 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from news.models import News, Tag
+from news.renderers import NewsJSONRenderer
+from news.serializers import NewsRowSerializer, NewsSerializer
+from news.views import READ_FIELDS, SUMMARY_FIELDS
+
+
+BENCHMARK_SOURCE_PREFIX = 'https://benchmark.invalid/'
+
+
+def seed_articles(count):
+    """Top up the active articles to ``count`` with synthetic ones, returning how many were added."""
+    missing = count - News.objects.filter(is_active=True).count()
+    if missing <= 0:
+        return 0
+    tags = [Tag.objects.get_or_create(name=f'بنچمارک {n}', slug=f'benchmark-{n}')[0] for n in range(5)]
+    now = timezone.now()
+    news = []
+    for n in range(missing):
+        item = News(
+            title=f'خبر آزمایشی شماره {n}', content='متن خبر آزمایشی برای سنجش سرعت. ' * 60,
+            source=f'{BENCHMARK_SOURCE_PREFIX}{n}', published_at=now - timedelta(minutes=n),
+        )
+        item.update_search_document()
+        news.append(item)
+    News.objects.bulk_create(news)
+    ids = News.objects.filter(source__startswith=BENCHMARK_SOURCE_PREFIX).values_list('id', flat=True)
+    News.tags.through.objects.bulk_create([
+        News.tags.through(news_id=news_id, tag_id=tags[(news_id + k) % len(tags)].id)
+        for news_id in ids for k in range(3)
+    ])
+    return missing
+
+
+def remove_seeded_articles():
+    News.objects.filter(source__startswith=BENCHMARK_SOURCE_PREFIX).delete()
+    Tag.objects.filter(slug__startswith='benchmark-').delete()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compares requests/sec and CPU per request of the DRF serializer and the row-based renderer for list pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--page-sizes', default='20,100')
+        parser.add_argument('--view', choices=['summary', 'full'], default='full')
+
+    def handle(self, *args, **options):
+        page_sizes = [int(size) for size in options['page_sizes'].split(',')]
+        fields = READ_FIELDS if options['view'] == 'full' else SUMMARY_FIELDS
+        results = []
+        try:
+            with transaction.atomic():
+                seed_articles(max(page_sizes))
+                for size in page_sizes:
+                    if self.render_serializer(size, fields) != self.render_rows(size, fields):
+                        raise CommandError(f"Row renderer output differs from NewsSerializer for {size} items")
+                    for name, render in (('serializer', self.render_serializer), ('rows', self.render_rows)):
+                        results.append((size, name, *self.measure(render, size, fields, options['iterations'])))
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(f"{'items':>6}  {'path':<12}{'req/sec':>10}{'CPU ms/req':>12}{'bytes':>10}")
+        for size, name, per_second, cpu_ms, size_bytes in results:
+            self.stdout.write(f"{size:>6}  {name:<12}{per_second:>10.1f}{cpu_ms:>12.2f}{size_bytes:>10}")
+
+    def queryset(self, size):
+        return News.objects.filter(is_active=True).order_by('-published_at')[:size]
+
+    def render_serializer(self, size, fields):
+        serializer = NewsSerializer(self.queryset(size).prefetch_related('tags'), many=True, fields=fields)
+        return JSONRenderer().render(serializer.data)
+
+    def render_rows(self, size, fields):
+        row_serializer = NewsRowSerializer(fields)
+        return NewsJSONRenderer().render(row_serializer.to_representation(row_serializer.rows(self.queryset(size))))
+
+    def measure(self, render, size, fields, iterations):
+        render(size, fields)
+        cpu, wall = time.process_time(), time.perf_counter()
+        for _ in range(iterations):
+            body = render(size, fields)
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+        return iterations / wall, cpu / iterations * 1000, len(body)
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from news.replicas import replicas
+
+
+def replication_lag(connection):
+    """``Seconds_Behind_Master`` of a MariaDB/MySQL replica, or None when unknown."""
+    if connection.vendor != 'mysql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SHOW SLAVE STATUS')
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        columns = [column[0] for column in cursor.description]
+    return dict(zip(columns, row)).get('Seconds_Behind_Master')
+
+
+class Command(BaseCommand):
+    help = 'Connects to the primary and every read replica, reporting connect time and replication lag'
+
+    def handle(self, *args, **options):
+        failed = False
+        self.stdout.write(f"{'alias':<12}{'status':<8}{'connect ms':>12}{'lag s':>8}{'conn max age':>14}")
+        for alias in [DEFAULT_DB_ALIAS, *replicas.aliases]:
+            connection = connections[alias]
+            connection.close()
+            started = time.perf_counter()
+            try:
+                connection.ensure_connection()
+                elapsed = (time.perf_counter() - started) * 1000
+                lag = replication_lag(connection) if alias != DEFAULT_DB_ALIAS else None
+            except DatabaseError as e:
+                failed = True
+                self.stdout.write(f"{alias:<12}{'down':<8}  {e}")
+                continue
+            self.stdout.write(
+                f"{alias:<12}{'ok':<8}{elapsed:>12.1f}{'-' if lag is None else lag:>8}"
+                f"{connection.settings_dict.get('CONN_MAX_AGE', 0):>14}"
+            )
+        if failed:
+            raise SystemExit(1)
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from news.management.commands.benchmark_news_api import remove_seeded_articles, seed_articles
+
+SERVER_PATHS = {
+    'wsgi': '/api/news/',
+    'asgi': '/api/async/news/',
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def fetch(host, port, target):
+    """One ``GET`` over a fresh connection; returns the status code."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f'GET {target} HTTP/1.1\r\nHost: {host}\r\nAccept: application/json\r\nConnection: close\r\n\r\n'.encode())
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    return int(status_line.split()[1])
+
+
+async def run_load(url, requests, concurrency, bust_cache):
+    parts = urlsplit(url)
+    base_target = parts.path + (f'?{parts.query}' if parts.query else '')
+    separator = '&' if parts.query else '?'
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        for n in counter:
+            target = f'{base_target}{separator}nocache={time.monotonic_ns()}-{n}' if bust_cache else base_target
+            started = time.perf_counter()
+            try:
+                status = await fetch(parts.hostname, parts.port or 80, target)
+            except OSError:
+                status = None
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'rps': requests / elapsed,
+        'p50': percentile(latencies, 0.50) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+        'errors': errors,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Load-tests the news list under WSGI (sync workers) and ASGI (uvicorn workers), reporting p50/p99 and requests/sec'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', default='wsgi,asgi', help='Comma-separated: wsgi, asgi')
+        parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers per server')
+        parser.add_argument('--concurrency', default='1,8,32', help='Comma-separated client counts')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per run')
+        parser.add_argument('--query', default='page_size=20', help='Query string for every request')
+        parser.add_argument('--url', action='append', default=[],
+                            help='Load-test an already running server instead (name=url); repeatable')
+        parser.add_argument('--seed', type=int, default=100,
+                            help='Top up to this many active articles for the run, removed afterwards')
+        parser.add_argument('--keep-cache', action='store_true',
+                            help='Let repeated requests hit the response cache instead of the database')
+
+    def handle(self, *args, **options):
+        concurrency_levels = [int(level) for level in options['concurrency'].split(',')]
+        seeded = seed_articles(options['seed']) if options['seed'] else 0
+        try:
+            if options['url']:
+                targets = [(name, url, None) for name, url in (spec.split('=', 1) for spec in options['url'])]
+            else:
+                targets = [
+                    self.start_server(name.strip(), options['workers'], options['query'])
+                    for name in options['servers'].split(',')
+                ]
+            try:
+                results = [
+                    (name, level, asyncio.run(
+                        run_load(url, options['requests'], level, bust_cache=not options['keep_cache'])
+                    ))
+                    for name, url, _ in targets
+                    for level in concurrency_levels
+                ]
+            finally:
+                for _, _, process in targets:
+                    if process is not None:
+                        process.terminate()
+                        process.wait(timeout=30)
+        finally:
+            if seeded:
+                remove_seeded_articles()
+
+        self.stdout.write(f"{'server':<8}{'clients':>8}{'req/sec':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for name, level, result in results:
+            self.stdout.write(
+                f"{name:<8}{level:>8}{result['rps']:>10.1f}{result['p50']:>10.1f}{result['p99']:>10.1f}"
+                f"{result['errors']:>8}"
+            )
+
+    def start_server(self, name, workers, query):
+        if name not in SERVER_PATHS:
+            raise CommandError(f"Unknown server {name!r}, expected one of {sorted(SERVER_PATHS)}")
+        port = free_port()
+        env = {
+            **os.environ,
+            'WEB_SERVER': name,
+            'WEB_BIND': f'127.0.0.1:{port}',
+            'WEB_CONCURRENCY': str(workers),
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'TakNews.settings'),
+        }
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--log-level', 'warning'],
+            cwd=Path(settings.BASE_DIR), env=env,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"{name} server exited with code {process.returncode}")
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+                break
+            except OSError:
+                time.sleep(0.2)
+        else:
+            process.terminate()
+            raise CommandError(f"{name} server did not start listening on port {port}")
+        return name, f'http://127.0.0.1:{port}{SERVER_PATHS[name]}?{query}', process
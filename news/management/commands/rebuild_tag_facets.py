@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from news.cache import bump_generation
+from news.facets import rebuild_tag_facets
+from news.models import TagActivity
+
+
+class Command(BaseCommand):
+    help = 'Recomputes Tag.news_count and the hourly TagActivity buckets from the news table'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        changed = rebuild_tag_facets()
+        bump_generation()
+        self.stdout.write(
+            f"Rebuilt {TagActivity.objects.count()} tag/hour buckets in {time.perf_counter() - started:.2f}s; "
+            f"{len(changed)} tag counts were off"
+        )
+        for tag in changed[:20]:
+            self.stdout.write(f"  {tag.id}: now {tag.news_count}")
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:34
+
+from django.db import migrations, models
+
+from news.search import build_search_document
+
+
+def fill_search_document(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    batch = []
+    for news in News.objects.only('id', 'title', 'content').iterator(chunk_size=500):
+        news.search_document = build_search_document(news.title, news.content)
+        batch.append(news)
+        if len(batch) >= 500:
+            News.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    if batch:
+        News.objects.bulk_update(batch, ['search_document'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_document, migrations.RunPython.noop),
+    ]
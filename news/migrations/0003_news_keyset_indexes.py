@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_news_search_document'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['published_at', 'id'], name='news_published_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['title', 'id'], name='news_title_id_idx'),
+        ),
+    ]
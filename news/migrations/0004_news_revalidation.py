@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:50
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def fill_content_hash(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    batch = []
+    for news in News.objects.only('id', 'title', 'content').iterator(chunk_size=500):
+        news.content_hash = hashlib.sha256(f'{news.title.strip()}\n{news.content.strip()}'.encode()).hexdigest()
+        batch.append(news)
+        if len(batch) >= 500:
+            News.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    if batch:
+        News.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_news_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='etag',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='last_modified',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(fill_content_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+# The auto-created News.tags table only has the (news_id, tag_id) unique key
+# and single-column FK indexes, so "news with tag X" lookups have no index
+# leading on tag_id that also covers news_id.
+TAG_NEWS_INDEX = models.Index(fields=['tag', 'news'], name='news_tag_news_idx')
+
+
+def add_tag_news_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model('news', 'News').tags.through, TAG_NEWS_INDEX)
+
+
+def remove_tag_news_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model('news', 'News').tags.through, TAG_NEWS_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_news_revalidation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['is_active', 'published_at', 'id'], name='news_active_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['is_active', 'title', 'id'], name='news_active_title_idx'),
+        ),
+        migrations.RunPython(add_tag_news_index, remove_tag_news_index),
+    ]
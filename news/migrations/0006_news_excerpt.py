@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+EXCERPT_LENGTH = 200
+
+
+def fill_excerpt(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    batch = []
+    for news in News.objects.only('id', 'content').iterator(chunk_size=500):
+        text = ' '.join(news.content.split())
+        if len(text) > EXCERPT_LENGTH:
+            text = text[:EXCERPT_LENGTH].rsplit(' ', 1)[0] + '...'
+        news.excerpt = text
+        batch.append(news)
+        if len(batch) >= 500:
+            News.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    if batch:
+        News.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_news_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=203),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
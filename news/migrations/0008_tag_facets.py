@@ -0,0 +1,56 @@
+import datetime
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_tag_facets(apps, schema_editor):
+    Tag = apps.get_model('news', 'Tag')
+    TagActivity = apps.get_model('news', 'TagActivity')
+    Through = apps.get_model('news', 'News').tags.through
+    buckets = Counter()
+    links = Through.objects.filter(news__is_active=True).values_list('tag_id', 'news__published_at')
+    for tag_id, published_at in links.iterator(chunk_size=5000):
+        hour = published_at.astimezone(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0)
+        buckets[tag_id, hour] += 1
+    TagActivity.objects.bulk_create(
+        [TagActivity(tag_id=tag_id, hour=hour, count=count) for (tag_id, hour), count in buckets.items()],
+        batch_size=1000,
+    )
+    per_tag = Counter()
+    for (tag_id, _), count in buckets.items():
+        per_tag[tag_id] += count
+    tags = list(Tag.objects.filter(id__in=per_tag).only('id'))
+    for tag in tags:
+        tag.news_count = per_tag[tag.id]
+    Tag.objects.bulk_update(tags, ['news_count'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_news_export_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='news_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='TagActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='news.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour', 'tag'], name='tag_activity_hour_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tag', 'hour'), name='tag_activity_tag_hour_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_tag_facets, migrations.RunPython.noop),
+    ]
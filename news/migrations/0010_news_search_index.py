@@ -0,0 +1,32 @@
+from django.db import migrations
+
+from news.search import VENDOR_BACKENDS
+
+
+def install_search_index(apps, schema_editor):
+    backend = VENDOR_BACKENDS.get(schema_editor.connection.vendor)
+    if backend is not None:
+        backend().install(schema_editor.connection)
+
+
+def uninstall_search_index(apps, schema_editor):
+    backend = VENDOR_BACKENDS.get(schema_editor.connection.vendor)
+    if backend is not None:
+        backend().uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    """The FULLTEXT index (MariaDB) or FTS5 table and triggers (SQLite) behind ``search=``.
+
+    Databases that already got the index from the old ``post_migrate`` hook
+    are left as they are. A later migration that makes SQLite rebuild
+    ``news_news`` drops the triggers and has to run the install again.
+    """
+
+    dependencies = [
+        ('news', '0009_news_change_outbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
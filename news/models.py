@@ -1,14 +1,41 @@
+import hashlib
+
 from django.db import models
 
+from .search import build_search_document
+
+EXCERPT_LENGTH = 200
+
 
 class Tag(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True)
+    news_count = models.IntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
 
 
+class TagActivity(models.Model):
+    """Active articles carrying ``tag`` that were published in ``hour`` (UTC, truncated).
+
+    Kept up to date with ``Tag.news_count`` by ``news.facets``; see
+    ``rebuild_tag_facets`` for repairs.
+    """
+
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='activity')
+    hour = models.DateTimeField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tag', 'hour'], name='tag_activity_tag_hour_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['hour', 'tag'], name='tag_activity_hour_idx'),
+        ]
+
+
 class News(models.Model):
     title = models.CharField(max_length=250)
     content = models.TextField()
@@ -18,11 +45,61 @@ class News(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    search_document = models.TextField(blank=True, default='', editable=False)
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH + 3, blank=True, default='', editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+    etag = models.CharField(max_length=255, blank=True, default='', editable=False)
+    last_modified = models.CharField(max_length=64, blank=True, default='', editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['published_at', 'id'], name='news_published_id_idx'),
+            models.Index(fields=['title', 'id'], name='news_title_id_idx'),
+            models.Index(fields=['is_active', 'published_at', 'id'], name='news_active_published_idx'),
+            models.Index(fields=['is_active', 'title', 'id'], name='news_active_title_idx'),
+            models.Index(fields=['updated_at', 'id'], name='news_updated_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @staticmethod
+    def hash_content(title, content):
+        return hashlib.sha256(f'{title.strip()}\n{content.strip()}'.encode()).hexdigest()
+
+    @staticmethod
+    def make_excerpt(content, length=EXCERPT_LENGTH):
+        text = ' '.join(content.split())
+        if len(text) <= length:
+            return text
+        return text[:length].rsplit(' ', 1)[0] + '...'
+
+    def update_search_document(self):
+        self.search_document = build_search_document(self.title, self.content)
+        self.content_hash = self.hash_content(self.title, self.content)
+        self.excerpt = self.make_excerpt(self.content)
+
+    def save(self, *args, **kwargs):
+        self.update_search_document()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'title', 'content'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'search_document', 'content_hash', 'excerpt'}
+        super().save(*args, **kwargs)
+
     def get_short_content(self, length=100):
         if len(self.content) > length:
             return self.content[:length] + '...'
         return self.content
+
+
+class NewsChange(models.Model):
+    """Outbox of articles that became visible, in commit order, for the change feed.
+
+    Rows are only inserted once the article's own transaction has
+    committed, so an id is never handed out for an article readers cannot
+    see yet. ``news.changes.visible_changes`` covers the short window in
+    which two outbox inserts commit out of id order.
+    """
+
+    news = models.ForeignKey(News, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
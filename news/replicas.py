@@ -0,0 +1,129 @@
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = 'news_primary_until'
+
+_read_alias = ContextVar('news_read_alias', default=None)
+
+
+class ReplicaSet:
+    """Picks the database alias API reads are served from.
+
+    Reads go round-robin to the aliases in ``NEWS_DB_REPLICAS['ALIASES']``,
+    everything else stays on ``default``. A replica that fails to connect is
+    skipped for ``RETRY_SECONDS``, and with none left reads fall back to the
+    primary. For ``STICKY_SECONDS`` after a write, the writing client (by
+    cookie) and every cache refill (by the response cache's last-modified
+    time) read from the primary, so replica lag is never served or cached.
+    """
+
+    def __init__(self):
+        self.down_until = {}
+        self.reads = {}
+        self.connections_opened = {}
+        self._counter = itertools.count()
+
+    @property
+    def options(self):
+        return getattr(settings, 'NEWS_DB_REPLICAS', {})
+
+    @property
+    def aliases(self):
+        return [alias for alias in self.options.get('ALIASES', ()) if alias in settings.DATABASES]
+
+    @property
+    def sticky_seconds(self):
+        return self.options.get('STICKY_SECONDS', 5)
+
+    def healthy(self):
+        now = time.monotonic()
+        return [alias for alias in self.aliases if self.down_until.get(alias, 0) <= now]
+
+    def mark_down(self, alias, error):
+        self.down_until[alias] = time.monotonic() + self.options.get('RETRY_SECONDS', 30)
+        logger.warning(f"Database replica '{alias}' unavailable, reading from the primary: {error}")
+
+    def is_pinned(self, request, last_write=None):
+        now = time.time()
+        if last_write is not None and now - last_write < self.sticky_seconds:
+            return True
+        try:
+            return float(request.COOKIES.get(STICKY_COOKIE, 0)) > now
+        except ValueError:
+            return False
+
+    def choose(self, request, last_write=None):
+        """The alias to read from for ``request``; connects to it, so call it from sync code."""
+        candidates = [] if self.is_pinned(request, last_write) else self.healthy()
+        if candidates:
+            start = next(self._counter)
+            for offset in range(len(candidates)):
+                alias = candidates[(start + offset) % len(candidates)]
+                try:
+                    connections[alias].ensure_connection()
+                except DatabaseError as e:
+                    self.mark_down(alias, e)
+                    continue
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    @contextmanager
+    def reading_from(self, alias):
+        """Routes every ORM read inside the block to ``alias``."""
+        self.reads[alias] = self.reads.get(alias, 0) + 1
+        token = _read_alias.set(alias)
+        try:
+            yield alias
+        finally:
+            _read_alias.reset(token)
+
+    def pin(self, response):
+        """Keeps the client that just wrote on the primary for ``STICKY_SECONDS``."""
+        if self.aliases:
+            response.set_cookie(
+                STICKY_COOKIE, f'{time.time() + self.sticky_seconds:.3f}',
+                max_age=self.sticky_seconds, httponly=True, samesite='Lax',
+            )
+        return response
+
+    def connection_created(self, sender, connection, **kwargs):
+        self.connections_opened[connection.alias] = self.connections_opened.get(connection.alias, 0) + 1
+
+    def stats(self):
+        now = time.monotonic()
+        return {
+            alias: {
+                'reads': self.reads.get(alias, 0),
+                'connections_opened': self.connections_opened.get(alias, 0),
+                'conn_max_age': connections[alias].settings_dict.get('CONN_MAX_AGE', 0),
+                'healthy': self.down_until.get(alias, 0) <= now,
+            }
+            for alias in [DEFAULT_DB_ALIAS, *self.aliases]
+        }
+
+
+replicas = ReplicaSet()
+
+
+class ReplicaRouter:
+    """Sends reads inside ``ReplicaSet.reading_from`` to the chosen alias; all writes go to the primary."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *replicas.aliases}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
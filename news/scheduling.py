@@ -0,0 +1,226 @@
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import redis
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_redis_clients = {}
+
+
+def redis_client(url):
+    """One ``redis.Redis`` (and connection pool) per URL and process."""
+    client = _redis_clients.get(url)
+    if client is None:
+        client = _redis_clients[url] = redis.Redis.from_url(url, decode_responses=True)
+    return client
+
+
+class RunLock:
+    """A leased lock on a key, owned by whoever holds ``token``.
+
+    The lease expires on its own if the holder dies; while the holder is
+    alive ``heartbeat()`` keeps extending it. With ``redis_url`` the lock
+    is a ``SET NX PX`` on that server, and ``renew`` and ``release``
+    compare the token and act in one Lua script, so a holder whose lease
+    lapsed can never extend or delete its successor's lock. Without it
+    the lock lives in ``cache`` (local development, tests), which checks
+    and acts in two steps.
+    """
+
+    def __init__(self, cache, key, lease_seconds=300, heartbeat_seconds=60, redis_url=None):
+        self.cache = cache
+        self.key = key
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.redis = redis_client(redis_url) if redis_url else None
+        self.token = uuid.uuid4().hex
+
+    def acquire(self):
+        if self.redis is not None:
+            return bool(self.redis.set(self.key, self.token, nx=True, px=int(self.lease_seconds * 1000)))
+        return self.cache.add(self.key, self.token, self.lease_seconds)
+
+    def is_held(self):
+        if self.redis is not None:
+            return bool(self.redis.exists(self.key))
+        return self.cache.get(self.key) is not None
+
+    def is_owned(self):
+        if self.redis is not None:
+            return self.redis.get(self.key) == self.token
+        return self.cache.get(self.key) == self.token
+
+    def renew(self):
+        if self.redis is not None:
+            return bool(self.redis.eval(RENEW_SCRIPT, 1, self.key, self.token, int(self.lease_seconds * 1000)))
+        return self.is_owned() and self.cache.touch(self.key, self.lease_seconds)
+
+    def release(self):
+        if self.redis is not None:
+            self.redis.eval(RELEASE_SCRIPT, 1, self.key, self.token)
+        elif self.is_owned():
+            self.cache.delete(self.key)
+
+    @contextmanager
+    def heartbeat(self):
+        stopped = threading.Event()
+
+        def beat():
+            while not stopped.wait(self.heartbeat_seconds):
+                if not self.renew():
+                    logger.warning(f"Lost run lock {self.key}")
+                    return
+
+        thread = threading.Thread(target=beat, name=f'heartbeat:{self.key}', daemon=True)
+        thread.start()
+        try:
+            yield self
+        finally:
+            stopped.set()
+            thread.join()
+
+
+class ScrapeScheduler:
+    """Decides whether a beat actually starts a scrape run.
+
+    Only one run holds the lock at a time. Beats arriving during a run are
+    coalesced into a single pending follow-up, started once the run ends.
+    Every run that finds no new articles doubles the wait before the next
+    one (up to ``max_interval``); a run with new articles resets it to
+    ``min_interval``.
+    """
+
+    def __init__(self, cache_alias='default', prefix='scrape_news', lease_seconds=300, heartbeat_seconds=60,
+                 min_interval=60, max_interval=3600, backoff_factor=2.0, lock_url=None):
+        self.cache_alias = cache_alias
+        self.lock_url = lock_url
+        self.prefix = prefix
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+
+    @classmethod
+    def from_settings(cls, **overrides):
+        options = getattr(settings, 'SCRAPER_SCHEDULE', {})
+        return cls(**{
+            'cache_alias': options.get('CACHE_ALIAS', 'default'),
+            'lock_url': options.get('LOCK_URL'),
+            'lease_seconds': options.get('LEASE_SECONDS', 300),
+            'heartbeat_seconds': options.get('HEARTBEAT_SECONDS', 60),
+            'min_interval': options.get('MIN_INTERVAL', 60),
+            'max_interval': options.get('MAX_INTERVAL', 3600),
+            'backoff_factor': options.get('BACKOFF_FACTOR', 2.0),
+            **overrides,
+        })
+
+    @classmethod
+    def for_source(cls, source):
+        """A scheduler whose lock, backoff and interval are private to one news source."""
+        return cls.from_settings(prefix=f'scrape_news:{source.name}', min_interval=source.min_interval)
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def key(self, name):
+        return f'{self.prefix}:{name}'
+
+    def lock(self):
+        return RunLock(self.cache, self.key('lock'), self.lease_seconds, self.heartbeat_seconds, self.lock_url)
+
+    def next_interval(self, new_items):
+        if new_items:
+            empty_runs = 0
+            self.cache.set(self.key('empty_runs'), 0, None)
+        else:
+            empty_runs = self._incr('empty_runs')
+        return min(self.min_interval * self.backoff_factor ** empty_runs, self.max_interval)
+
+    def not_due(self):
+        """A skip summary if the next run is not due yet, else ``None``."""
+        next_due = self.cache.get(self.key('next_due'), 0)
+        if time.time() >= next_due:
+            return None
+        skipped = self._incr('skipped')
+        return {'status': 'skipped', 'reason': 'not_due', 'next_run_in': round(next_due - time.time(), 1),
+                'skipped': skipped}
+
+    def record(self, stats, duration):
+        """Schedule the next run from a finished run's crawl stats and summarise it."""
+        new_items = stats.get('news_pipeline/created', 0)
+        interval = self.next_interval(new_items)
+        self.cache.set(self.key('next_due'), time.time() + interval, None)
+        logger.info(f"Scrape run took {duration:.1f}s, {new_items} new, next run in {interval:.0f}s")
+        return {
+            'status': 'completed',
+            'duration_seconds': round(duration, 3),
+            'startup_seconds': stats.get('crawl/startup_seconds'),
+            'new_items': new_items,
+            'next_run_in': interval,
+            'skipped': self._pop('skipped'),
+        }
+
+    def run(self, job, force=False):
+        """Run ``job`` (returning crawl stats) unless a run is active or not yet due; return a summary."""
+        skip = None if force else self.not_due()
+        if skip is not None:
+            return skip
+
+        lock = self.lock()
+        if not lock.acquire():
+            return self.coalesce()
+
+        started = time.perf_counter()
+        try:
+            with lock.heartbeat():
+                stats = job() or {}
+            result = self.settle(self.record(stats, time.perf_counter() - started))
+        finally:
+            lock.release()
+        return result
+
+    def is_running(self):
+        return self.lock().is_held()
+
+    def coalesce(self):
+        """Fold a beat that found a run in progress into that run's single follow-up."""
+        self.cache.set(self.key('pending'), True, self.lease_seconds)
+        coalesced = self._incr('coalesced')
+        logger.info(f"Scrape already running, coalesced {coalesced} beat(s) into one follow-up")
+        return {'status': 'skipped', 'reason': 'running', 'coalesced': coalesced}
+
+    def settle(self, result):
+        """Add the beats coalesced during a run to its summary, and whether they ask for a follow-up."""
+        result['coalesced'] = self._pop('coalesced')
+        result['follow_up'] = bool(self.cache.delete(self.key('pending')))
+        return result
+
+    def _incr(self, name):
+        self.cache.add(self.key(name), 0, None)
+        return self.cache.incr(self.key(name))
+
+    def _pop(self, name):
+        value = self.cache.get(self.key(name), 0)
+        self.cache.delete(self.key(name))
+        return value
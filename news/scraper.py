@@ -1,21 +1,70 @@
-from billiard import Process
+import logging
+import time
+from queue import Empty
+
+from billiard import Process, Queue
+from django.conf import settings
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
-from scraper.spiders.zoomit_spider import ZoomitSpider
+from scraper.browser import BrowserStartupError, browser_service
+from scraper.sources import get_source
+from scraper.spiders.news_spider import NewsSpider
+
+logger = logging.getLogger(__name__)
 
 
-def run_spider():
-    process = CrawlerProcess(get_project_settings())
-    process.crawl(ZoomitSpider)
+def run_spider(source_name='zoomit', cdp_url=None, result_queue=None, started_at=None):
+    source = get_source(source_name)
+    crawl_settings = get_project_settings()
+    crawl_settings.set('CRAWL_STARTED_AT', started_at or time.time())
+    if cdp_url:
+        crawl_settings.set('PLAYWRIGHT_CDP_URL', cdp_url)
+    crawl_settings.set('LOG_FILE', f'logs/{source.name}_scraping.log', priority='cmdline')
+    process = CrawlerProcess(crawl_settings)
+    crawler = process.create_crawler(NewsSpider)
+    process.crawl(crawler, source=source.name, profile=source.profile or getattr(settings, 'SCRAPER_THROUGHPUT_PROFILE', None))
     process.start()
+    if result_queue is not None:
+        result_queue.put(crawler.stats.get_stats())
+
+
+def collect_result(process, result_queue, poll_seconds=1.0):
+    """The child's stats, read while it runs; ``{}`` if it exits without sending any.
 
+    A child does not exit until its queued data has been read, so joining
+    it before reading a result larger than the pipe buffer would deadlock.
+    """
+    while True:
+        try:
+            return result_queue.get(timeout=poll_seconds)
+        except Empty:
+            if not process.is_alive():
+                try:
+                    return result_queue.get_nowait()
+                except Empty:
+                    return {}
 
-def scrape_news():
-    p = Process(target=run_spider)
+
+def scrape_news(source_name='zoomit'):
+    cdp_url = None
+    if getattr(settings, 'SCRAPER_BROWSER_POOL', {}).get('ENABLED'):
+        try:
+            cdp_url = browser_service.acquire()
+        except BrowserStartupError as e:
+            logger.error(f"Falling back to a per-run browser: {e}")
+
+    result_queue = Queue()
+    p = Process(target=run_spider, args=(source_name, cdp_url, result_queue, time.time()))
     p.start()
+    stats = collect_result(p, result_queue)
     p.join()
 
+    if cdp_url:
+        browser_service.release(pages=stats.get('playwright/page_count', 0))
+        logger.info(f"Browser pool: {browser_service.stats()}")
+
     if p.exitcode == 0:
-        print("Scraping completed successfully")
+        print(f"Scraping {source_name} completed successfully")
     else:
-        print(f"Scraping failed with exit code: {p.exitcode}")
\ No newline at end of file
+        print(f"Scraping {source_name} failed with exit code: {p.exitcode}")
+    return stats
@@ -0,0 +1,255 @@
+import re
+import unicodedata
+from functools import reduce
+from operator import add
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import BooleanField, Case, FloatField, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+ZWNJ = '\u200c'
+
+PERSIAN_CHAR_MAP = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ئ': 'ی',
+    'ك': 'ک',
+    'ة': 'ه', 'ۀ': 'ه',
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ؤ': 'و',
+    '۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4',
+    '۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+    ZWNJ: None, '\u200d': None, '\u0640': None,
+})
+
+ARABIC_DIACRITICS = re.compile('[\u064b-\u065f\u0670]')
+TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', text).translate(PERSIAN_CHAR_MAP)
+    return ARABIC_DIACRITICS.sub('', text).lower()
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(normalize(text))
+
+
+def build_search_document(*parts):
+    return ' '.join(token for part in parts for token in tokenize(part))
+
+
+class BaseSearchBackend:
+    vendor = None
+    rank_alias = 'search_rank'
+
+    def filter(self, queryset, text, match_all=False):
+        raise NotImplementedError
+
+    def exclude(self, queryset, text):
+        raise NotImplementedError
+
+    def rank(self, queryset, text):
+        raise NotImplementedError
+
+    def install(self, connection):
+        pass
+
+    def uninstall(self, connection):
+        pass
+
+    def quote(self, queryset, column):
+        qn = connections[queryset.db].ops.quote_name
+        return f'{qn(queryset.model._meta.db_table)}.{qn(column)}'
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """Substring matching over the normalized ``search_document`` column, works on any database."""
+
+    def _q(self, tokens, match_all):
+        queries = [Q(search_document__contains=token) for token in tokens]
+        return reduce((lambda a, b: a & b) if match_all else (lambda a, b: a | b), queries)
+
+    def filter(self, queryset, text, match_all=False):
+        tokens = tokenize(text)
+        if not tokens:
+            return queryset.none()
+        return queryset.filter(self._q(tokens, match_all))
+
+    def exclude(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return queryset
+        return queryset.exclude(self._q(tokens, match_all=False))
+
+    def rank(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return queryset.annotate(**{self.rank_alias: Value(0.0, output_field=FloatField())})
+        hits = [
+            Case(When(search_document__contains=token, then=Value(1)), default=Value(0), output_field=IntegerField())
+            for token in tokens
+        ]
+        return queryset.annotate(**{self.rank_alias: reduce(add, hits)})
+
+
+class MySQLFullTextBackend(BaseSearchBackend):
+    """InnoDB/MariaDB FULLTEXT index over ``search_document`` queried in boolean mode."""
+
+    vendor = 'mysql'
+    index_name = 'news_news_search_ft'
+
+    def _match(self, queryset):
+        return f"MATCH({self.quote(queryset, 'search_document')}) AGAINST (%s IN BOOLEAN MODE)"
+
+    def _query(self, tokens, match_all):
+        prefix = '+' if match_all else ''
+        return ' '.join(f'{prefix}{token}*' for token in tokens)
+
+    def filter(self, queryset, text, match_all=False):
+        tokens = tokenize(text)
+        if not tokens:
+            return queryset.none()
+        return queryset.filter(
+            RawSQL(self._match(queryset), [self._query(tokens, match_all)], output_field=BooleanField())
+        )
+
+    def exclude(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return queryset
+        return queryset.exclude(
+            RawSQL(self._match(queryset), [self._query(tokens, False)], output_field=BooleanField())
+        )
+
+    def rank(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return queryset.annotate(**{self.rank_alias: Value(0.0, output_field=FloatField())})
+        return queryset.annotate(**{
+            self.rank_alias: RawSQL(self._match(queryset), [self._query(tokens, False)], output_field=FloatField())
+        })
+
+    def _index_exists(self, cursor, table):
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+            [table, self.index_name],
+        )
+        return bool(cursor.fetchone()[0])
+
+    def install(self, connection):
+        from .models import News
+
+        table = News._meta.db_table
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            if not self._index_exists(cursor, table):
+                cursor.execute(
+                    f"CREATE FULLTEXT INDEX {qn(self.index_name)} ON {qn(table)} ({qn('search_document')})"
+                )
+
+    def uninstall(self, connection):
+        from .models import News
+
+        table = News._meta.db_table
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            if self._index_exists(cursor, table):
+                cursor.execute(f"DROP INDEX {qn(self.index_name)} ON {qn(table)}")
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """External-content FTS5 table kept in sync with ``news_news`` by triggers."""
+
+    vendor = 'sqlite'
+    fts_table = 'news_news_fts'
+
+    def _query(self, tokens, match_all):
+        joiner = ' AND ' if match_all else ' OR '
+        return joiner.join(f'"{token}"*' for token in tokens)
+
+    def _ids(self, tokens, match_all):
+        return RawSQL(
+            f'SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s',
+            [self._query(tokens, match_all)],
+        )
+
+    def filter(self, queryset, text, match_all=False):
+        tokens = tokenize(text)
+        if not tokens:
+            return queryset.none()
+        return queryset.filter(id__in=self._ids(tokens, match_all))
+
+    def exclude(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return queryset
+        return queryset.exclude(id__in=self._ids(tokens, False))
+
+    def rank(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return queryset.annotate(**{self.rank_alias: Value(0.0, output_field=FloatField())})
+        sql = (
+            f'SELECT -bm25({self.fts_table}) FROM {self.fts_table} '
+            f'WHERE {self.fts_table} MATCH %s AND rowid = {self.quote(queryset, "id")}'
+        )
+        return queryset.annotate(**{
+            self.rank_alias: RawSQL(sql, [self._query(tokens, False)], output_field=FloatField())
+        })
+
+    def install(self, connection):
+        from .models import News
+
+        table = News._meta.db_table
+        fts = self.fts_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f'{fts}_%'],
+            )
+            if cursor.fetchone()[0] == 3:
+                return
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"search_document, content='{table}', content_rowid='id', tokenize='unicode61')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, search_document) VALUES (new.id, new.search_document); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, search_document) VALUES ('delete', old.id, old.search_document); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, search_document) VALUES ('delete', old.id, old.search_document); "
+                f"INSERT INTO {fts}(rowid, search_document) VALUES (new.id, new.search_document); END"
+            )
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def uninstall(self, connection):
+        fts = self.fts_table
+        with connection.cursor() as cursor:
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+VENDOR_BACKENDS = {
+    'mysql': MySQLFullTextBackend,
+    'sqlite': SQLiteFTS5Backend,
+}
+
+
+def get_search_backend(using=DEFAULT_DB_ALIAS):
+    path = getattr(settings, 'NEWS_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connections[using].vendor, BasicSearchBackend)()
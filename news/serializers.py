@@ -1,6 +1,6 @@
-from django.utils.text import slugify
 from rest_framework import serializers
 from .models import News, Tag
+from .tags import tag_resolver
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -20,7 +20,16 @@ class NewsSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = News
-        fields = ['id', 'title', 'content', 'source', 'published_at', 'created_at', 'updated_at', 'is_active', 'tags', 'tags_info']
+        fields = [
+            'id', 'title', 'excerpt', 'content', 'source', 'published_at', 'created_at', 'updated_at', 'is_active',
+            'tags', 'tags_info',
+        ]
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
     def get_tags_info(self, obj):
         return TagSerializer(obj.tags.all(), many=True).data
@@ -29,14 +38,9 @@ class NewsSerializer(serializers.ModelSerializer):
         tag_names = validated_data.pop('tags', [])
         news = News.objects.create(**validated_data)
 
-        for name in tag_names:
-            name = name.strip()
-            if name:
-                tag, _ = Tag.objects.get_or_create(
-                    name=name,
-                    defaults={'slug': slugify(name)}
-                )
-                news.tags.add(tag)
+        tag_ids = tag_resolver.resolve(tag_names).values()
+        if tag_ids:
+            news.tags.add(*tag_ids)
         return news
 
     def update(self, instance, validated_data):
@@ -46,14 +50,66 @@ class NewsSerializer(serializers.ModelSerializer):
         instance.save()
 
         if tag_names is not None:
-            tags = []
-            for name in tag_names:
-                name = name.strip()
-                if name:
-                    tag, _ = Tag.objects.get_or_create(
-                        name=name,
-                        defaults={'slug': slugify(name)}
-                    )
-                    tags.append(tag)
-            instance.tags.set(tags)
+            instance.tags.set(tag_resolver.resolve(tag_names).values())
         return instance
+
+
+class NewsRowSerializer:
+    """Read-only counterpart of ``NewsSerializer`` for ``.values()`` rows.
+
+    Gives the same data as ``NewsSerializer(..., fields=fields)`` without
+    DRF's per-field machinery: datetimes go through a single
+    ``DateTimeField``, and a page's tags come from one query, with each tag
+    built once and shared by every article that carries it.
+    """
+
+    datetime_fields = ('published_at', 'created_at', 'updated_at')
+    # Needed by keyset pagination even when not requested.
+    required_columns = ('id', 'published_at', 'title')
+
+    def __init__(self, fields):
+        self.fields = [name for name in NewsSerializer.Meta.fields if name in fields and name != 'tags']
+        self.columns = [name for name in self.fields if name != 'tags_info']
+        self.columns += [name for name in self.required_columns if name not in self.columns]
+        self.format_datetime = serializers.DateTimeField().to_representation
+
+    def rows(self, queryset):
+        return queryset.values(*self.columns)
+
+    def tag_rows(self, news_ids):
+        return Tag.objects.filter(news__in=news_ids).values_list('news', 'id', 'name', 'slug')
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        tag_rows = self.tag_rows([row['id'] for row in rows]) if 'tags_info' in self.fields else None
+        return self.build(rows, tag_rows)
+
+    async def ato_representation(self, rows):
+        rows = [row async for row in rows] if hasattr(rows, '__aiter__') else list(rows)
+        tag_rows = None
+        if 'tags_info' in self.fields:
+            tag_rows = [tag async for tag in self.tag_rows([row['id'] for row in rows])]
+        return self.build(rows, tag_rows)
+
+    def build(self, rows, tag_rows=None):
+        with_tags = tag_rows is not None
+        tags = {}
+        by_news = {row['id']: [] for row in rows}
+        for news_id, tag_id, name, slug in tag_rows or ():
+            tag = tags.get(tag_id)
+            if tag is None:
+                tag = tags[tag_id] = {'id': tag_id, 'name': name, 'slug': slug}
+            by_news[news_id].append(tag)
+
+        format_datetime = self.format_datetime
+        converters = [
+            (name, format_datetime if name in self.datetime_fields else None)
+            for name in self.fields if name != 'tags_info'
+        ]
+        data = []
+        for row in rows:
+            item = {name: convert(row[name]) if convert else row[name] for name, convert in converters}
+            if with_tags:
+                item['tags_info'] = by_news[row['id']]
+            data.append(item)
+        return data
@@ -0,0 +1,82 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_generation
+from .changes import record_changes_on_commit
+from .facets import apply_deltas, contributions, news_contributions
+from .models import News, Tag
+from .tags import tag_resolver
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=News.tags.through)
+def invalidate_news_responses(sender, **kwargs):
+    # Bumping before commit would let a concurrent read cache the old rows under the new generation.
+    if kwargs.get('action', 'post_').startswith('post_'):
+        transaction.on_commit(bump_generation)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def reset_tag_resolver(sender, created=False, **kwargs):
+    if not created:
+        transaction.on_commit(tag_resolver.invalidate)
+
+
+@receiver(post_save, sender=News)
+def announce_visible_news(sender, instance, created=False, **kwargs):
+    old = getattr(instance, '_counted_state', None)
+    if instance.is_active and (created or (old is not None and not old[0])):
+        record_changes_on_commit([instance.pk])
+
+
+@receiver(pre_save, sender=News)
+def remember_counted_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._counted_state = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not {'is_active', 'published_at'} & set(update_fields):
+        return
+    instance._counted_state = News.objects.filter(pk=instance.pk).values_list('is_active', 'published_at').first()
+
+
+@receiver(post_save, sender=News)
+def count_tags_on_save(sender, instance, created=False, **kwargs):
+    old = getattr(instance, '_counted_state', None)
+    new = (instance.is_active, instance.published_at)
+    if created or old is None or old == new:
+        return
+    tag_ids = list(instance.tags.values_list('id', flat=True))
+    deltas = Counter()
+    if old[0]:
+        deltas.update(contributions(((tag_id, old[1]) for tag_id in tag_ids), -1))
+    if new[0]:
+        deltas.update(contributions((tag_id, new[1]) for tag_id in tag_ids))
+    apply_deltas(deltas)
+
+
+@receiver(pre_delete, sender=News)
+def uncount_tags_on_delete(sender, instance, **kwargs):
+    if instance.is_active:
+        apply_deltas(news_contributions([instance.pk], -1))
+
+
+@receiver(m2m_changed, sender=News.tags.through)
+def count_tags_on_tagging(sender, instance, action, reverse, pk_set, **kwargs):
+    # Removals are counted before the rows go, since pk_set may name links that never existed.
+    if action == 'post_add':
+        sign = 1
+    elif action in ('pre_remove', 'pre_clear'):
+        sign = -1
+    else:
+        return
+    links = sender.objects.filter(tag=instance) if reverse else sender.objects.filter(news=instance)
+    if action != 'pre_clear':
+        links = links.filter(**{'news__in' if reverse else 'tag__in': pk_set})
+    apply_deltas(contributions(links.filter(news__is_active=True).values_list('tag_id', 'news__published_at'), sign))
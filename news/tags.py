@@ -0,0 +1,153 @@
+import logging
+import threading
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+from .models import Tag
+
+logger = logging.getLogger(__name__)
+
+SLUG_MAX_LENGTH = Tag._meta.get_field('slug').max_length
+GENERATION_KEY = 'tags:generation'
+
+
+def tag_slug(name, suffix=None):
+    slug = slugify(name, allow_unicode=True) or 'tag'
+    if suffix is None:
+        return slug[:SLUG_MAX_LENGTH]
+    suffix = f'-{suffix}'
+    return slug[:SLUG_MAX_LENGTH - len(suffix)] + suffix
+
+
+def clean_tag_names(names):
+    cleaned = []
+    for name in names or []:
+        name = name.strip()
+        if name and name not in cleaned:
+            cleaned.append(name)
+    return cleaned
+
+
+class TagResolver:
+    """Maps tag names to ids through a bounded, process-wide LRU cache.
+
+    Misses are looked up in one query and the remainder created in bulk.
+    Ids only enter the cache once the surrounding transaction commits, so
+    a rolled-back insert can never leave a dangling id behind.
+
+    Renaming or deleting a tag bumps a generation counter in the shared
+    cache, and every process drops its cached ids when it sees a new
+    generation. The query for a batch's misses also re-checks the batch's
+    cached names, so an id that went stale unnoticed is replaced there.
+    """
+
+    def __init__(self, max_size=5000, max_slug_attempts=20, cache_alias='default'):
+        self.max_size = max_size
+        self.max_slug_attempts = max_slug_attempts
+        self.cache_alias = cache_alias
+        self._cache = OrderedDict()
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def warm(self):
+        self._check_generation()
+        tag_ids = dict(Tag.objects.order_by('-id').values_list('name', 'id')[:self.max_size])
+        transaction.on_commit(lambda: self._remember(tag_ids))
+        return len(tag_ids)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def invalidate(self):
+        """Make every process drop its cached ids, e.g. after a tag is renamed or deleted."""
+        try:
+            cache = caches[self.cache_alias]
+            cache.add(GENERATION_KEY, 0, None)
+            cache.incr(GENERATION_KEY)
+        except Exception as e:
+            logger.error(f"Could not invalidate cached tag ids: {e}")
+        self.clear()
+
+    def _check_generation(self):
+        try:
+            generation = caches[self.cache_alias].get(GENERATION_KEY, 0)
+        except Exception as e:
+            logger.warning(f"Tag generation unavailable, not trusting cached tag ids: {e}")
+            generation = None
+        with self._lock:
+            if generation is None or generation != self._generation:
+                self._cache.clear()
+                self._generation = generation
+
+    def forget(self, name):
+        with self._lock:
+            self._cache.pop(name, None)
+
+    def resolve(self, names):
+        names = clean_tag_names(names)
+        self._check_generation()
+        resolved = {}
+        misses = []
+        with self._lock:
+            for name in names:
+                if name in self._cache:
+                    self._cache.move_to_end(name)
+                    resolved[name] = self._cache[name]
+                else:
+                    misses.append(name)
+
+        if misses:
+            found = self._lookup(names)
+            missing = [name for name in names if name not in found]
+            if missing:
+                found.update(self._create(missing))
+            resolved.update(found)
+            transaction.on_commit(lambda: self._remember(found))
+
+        return {name: resolved[name] for name in names}
+
+    def _lookup(self, names):
+        rows = list(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+        exact = dict(rows)
+        folded = {name.casefold(): tag_id for name, tag_id in rows}
+        found = {}
+        for name in names:
+            tag_id = exact.get(name, folded.get(name.casefold()))
+            if tag_id is not None:
+                found[name] = tag_id
+        return found
+
+    def _create(self, names):
+        Tag.objects.bulk_create([Tag(name=name, slug=tag_slug(name)) for name in names], ignore_conflicts=True)
+        created = self._lookup(names)
+        for name in names:
+            if name not in created:
+                created[name] = self._create_one(name)
+        logger.info(f"Created Tags: {', '.join(names)}")
+        return created
+
+    def _create_one(self, name):
+        for attempt in range(2, self.max_slug_attempts + 2):
+            try:
+                with transaction.atomic():
+                    return Tag.objects.create(name=name, slug=tag_slug(name, suffix=attempt)).id
+            except IntegrityError:
+                existing = self._lookup([name])
+                if existing:
+                    return existing[name]
+        raise IntegrityError(f"Could not find a free slug for tag {name!r}")
+
+    def _remember(self, mapping):
+        with self._lock:
+            for name, tag_id in mapping.items():
+                self._cache[name] = tag_id
+                self._cache.move_to_end(name)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+
+tag_resolver = TagResolver()
@@ -1,9 +1,49 @@
 from celery import shared_task
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+from news.scheduling import ScrapeScheduler
 from news.scraper import scrape_news
+from scraper.browser import browser_service
+from scraper.crawl_queue import crawl_queue
+from scraper.sources import enabled_sources, get_source
 
 
 @shared_task
-def scrape_news_task():
-    print("Starting news scraping task...")
-    scrape_news()
-    print("News scraping completed!")
+def scrape_sources_task():
+    """Fan out one ``scrape_news_task`` per enabled source onto that source's queue."""
+    sources = enabled_sources()
+    for source in sources:
+        scrape_news_task.apply_async(kwargs={'source': source.name}, queue=source.queue)
+    return [source.name for source in sources]
+
+
+@shared_task
+def scrape_news_task(source='zoomit', follow_up=False):
+    print(f"Starting news scraping task for {source}...")
+    news_source = get_source(source)
+    scheduler = ScrapeScheduler.for_source(news_source)
+    if getattr(settings, 'SCRAPER_CRAWLER', {}).get('MODE') == 'worker':
+        result = enqueue_crawl(scheduler, news_source)
+    else:
+        result = scheduler.run(lambda: scrape_news(news_source.name), force=follow_up)
+        if result.get('follow_up'):
+            scrape_news_task.apply_async(kwargs={'source': source, 'follow_up': True}, queue=news_source.queue)
+    print(f"News scraping task for {source} finished: {result}")
+    return {'source': source, **result}
+
+
+def enqueue_crawl(scheduler, source):
+    skip = scheduler.not_due()
+    if skip is not None:
+        return skip
+    if scheduler.is_running():
+        return scheduler.coalesce()
+    job_id = crawl_queue.enqueue(source.name)
+    if job_id is None:
+        return {'status': 'skipped', 'reason': 'already_queued'}
+    return {'status': 'queued', 'job_id': job_id}
+
+
+@worker_process_shutdown.connect
+def close_browser_service(**kwargs):
+    browser_service.close()
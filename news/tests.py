@@ -1,13 +1,40 @@
+import asyncio
+import csv
+import gzip
+import json
+import os
+from unittest import mock, skipUnless
 from rest_framework.test import APIClient
-from django.test import TestCase
+import time
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
 from datetime import timedelta, datetime
-from .models import News, Tag
+from rest_framework.renderers import JSONRenderer
+from .cache import MODIFIED_KEY
+from .changes import ChangeFeed
+from .export import export_items
+from .facets import activity_hour, contributions
+from .models import News, NewsChange, Tag, TagActivity
+from .renderers import NewsJSONRenderer
+from .replicas import STICKY_COOKIE, replicas
+from .serializers import NewsRowSerializer, NewsSerializer
+from .views import READ_FIELDS, SUMMARY_FIELDS
+from .scheduling import RunLock, ScrapeScheduler
+from .scraper import collect_result
+from .search import normalize, tokenize
+from .tags import TagResolver, tag_resolver, tag_slug
+from scraper.pipelines import BatchedDjangoNewsPipeline
+from scraper.tests import make_item, redis_available
 
 
 class NewsAPITests(TestCase):
     def setUp(self):
+        caches['default'].clear()
         self.client = APIClient()
 
         self.tag_tech = Tag.objects.create(name='technology', slug='technology')
@@ -78,11 +105,34 @@ class NewsAPITests(TestCase):
         first_item = results[0]
         self.assertIn('id', first_item)
         self.assertIn('title', first_item)
-        self.assertIn('content', first_item)
+        self.assertIn('excerpt', first_item)
+        self.assertNotIn('content', first_item)
         self.assertIn('source', first_item)
         self.assertIn('tags_info', first_item)
         self.assertIn('published_at', first_item)
 
+    def test_list_defers_content_unless_requested(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/news/')
+        qn = connection.ops.quote_name
+        table = qn('news_news')
+        [select] = [q['sql'] for q in queries.captured_queries if f'FROM {table}' in q['sql'] and 'COUNT' not in q['sql']]
+        self.assertNotIn(f"{table}.{qn('content')}", select)
+        self.assertNotIn(f"{table}.{qn('search_document')}", select)
+        self.assertEqual(response.data['results'][0]['excerpt'], 'This is a news about sport.')
+
+        full = self.client.get('/api/news/?view=full').data['results'][0]
+        self.assertEqual(full['content'], 'This is a news about sport.')
+
+        picked = self.client.get('/api/news/?fields=id,title,content,bogus').data['results'][0]
+        self.assertEqual(set(picked), {'id', 'title', 'content'})
+
+    def test_excerpt_is_cut_on_a_word_boundary(self):
+        excerpt = News.make_excerpt('خبر ' * 100)
+        self.assertTrue(excerpt.endswith('خبر...'))
+        self.assertLessEqual(len(excerpt), 203)
+        self.assertEqual(News.make_excerpt('  short\n text '), 'short text')
+
     def test_get_single_news(self):
         url = f'/api/news/{self.news1.id}/'
         response = self.client.get(url)
@@ -169,6 +219,107 @@ class NewsAPITests(TestCase):
         response = self.client.get('/api/news/', {'page': 6})
         self.assertEqual(len(response.data['results']), 10)
 
+    def test_list_query_count_is_constant(self):
+        for i in range(120):
+            news = News.objects.create(
+                title=f"Extra News {i}",
+                content="Additional content",
+                source=f'https://extra.com/{i}',
+                published_at=timezone.now(),
+                is_active=True
+            )
+            news.tags.add(self.tag_tech, self.tag_economy)
+
+        for page_size in (20, 100):
+            with self.assertNumQueries(3):
+                response = self.client.get('/api/news/', {'page_size': page_size})
+            self.assertEqual(len(response.data['results']), page_size)
+            self.assertEqual(len(response.data['results'][0]['tags_info']), 2)
+
+    def test_cursor_pagination_walks_every_ordering(self):
+        published_at = timezone.now() - timedelta(days=10)
+        for i in range(25):
+            News.objects.create(
+                title=f"Extra News {i % 5}",
+                content="Additional content",
+                source=f'https://extra.com/{i}',
+                published_at=published_at + timedelta(hours=i % 3),
+                is_active=True
+            )
+        expected_count = News.objects.filter(is_active=True).count()
+
+        for ordering in ['published_at', '-published_at', 'title', '-title']:
+            seen = []
+            response = self.client.get('/api/news/', {'pagination': 'cursor', 'page_size': 7, 'ordering': ordering})
+            self.assertNotIn('count', response.data)
+            while True:
+                seen.extend(item['id'] for item in response.data['results'])
+                if response.data['next'] is None:
+                    break
+                if len(seen) == 7:
+                    News.objects.create(
+                        title=f"Late News {ordering}",
+                        content="Inserted mid-scan",
+                        source=f'https://extra.com/late{ordering}',
+                        published_at=timezone.now() + timedelta(days=1),
+                        is_active=True
+                    )
+                response = self.client.get(response.data['next'])
+            self.assertEqual(len(seen), len(set(seen)), ordering)
+            self.assertGreaterEqual(len(seen), expected_count, ordering)
+            expected_count += 1
+
+    def test_cursor_pagination_rejects_bad_cursor(self):
+        response = self.client.get('/api/news/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_response_cache_hit_and_conditional_get(self):
+        response = self.client.get('/api/news/', {'tags': 'economy'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/news/', {'tags': 'economy'})
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['count'], 1)
+
+        response = self.client.get('/api/news/', {'tags': 'economy'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_response_cache_invalidated_by_writes(self):
+        response = self.client.get('/api/news/', {'tags': 'economy'})
+        etag = response['ETag']
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post('/api/news/', {
+                'title': 'economy update',
+                'content': 'Markets rallied.',
+                'source': 'https://test2.com/update',
+                'published_at': timezone.now().isoformat(),
+                'tags': ['economy'],
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # Until the write commits, readers still get the old generation.
+        response = self.client.get('/api/news/', {'tags': 'economy'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        for callback in callbacks:
+            callback()
+
+        response = self.client.get('/api/news/', {'tags': 'economy'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 2)
+
+    def test_errors_are_never_answered_not_modified(self):
+        response = self.client.get('/api/news/', {'tags': 'economy'})
+        etag = response['ETag']
+        response = self.client.get('/api/news/999999/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get('/api/news/999999/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
     def test_inactive_news_not_returned(self):
         url = f'/api/news/{self.inactive_news.id}/'
         response = self.client.get(url)
@@ -191,3 +342,710 @@ class NewsAPITests(TestCase):
         response = self.client.get(url)
         self.assertIsInstance(response.data['published_at'], str)
         datetime.fromisoformat(response.data['published_at'])
+
+    def test_search_requires_all_terms(self):
+        response = self.client.get('/api/news/', {'search': 'technology artificial'})
+        titles = [item['title'] for item in response.data['results']]
+        self.assertEqual(titles, ['technology news'])
+
+    def test_relevance_ordering(self):
+        News.objects.create(
+            title="markets news",
+            content="Stock markets closed early.",
+            source='https://test2.com/markets',
+            published_at=timezone.now(),
+            is_active=True
+        )
+        response = self.client.get('/api/news/', {'keyword_include': 'stock markets growth', 'ordering': 'relevance'})
+        titles = [item['title'] for item in response.data['results']]
+        self.assertEqual(titles, ['economy news', 'markets news'])
+
+    def test_persian_search_normalization(self):
+        News.objects.create(
+            title="هوش مصنوعي در ايران",
+            content="مدل‌های زبانی جديد معرفي شد",
+            source='https://test1.com/fa',
+            published_at=timezone.now(),
+            is_active=True
+        )
+        for query in ['مصنوعی', 'مدل‌های', 'مدلهای', 'جدید']:
+            response = self.client.get('/api/news/', {'search': query})
+            self.assertEqual(len(response.data['results']), 1, query)
+
+    def test_fast_rendering_matches_serializer_bytes(self):
+        self.news2.tags.add(self.tag_tech, self.tag_sport)
+        self.news3.content = 'خبر ورزشی\u2028با "نقل قول" و \\ و \t'
+        self.news3.save()
+        queryset = News.objects.filter(is_active=True).order_by('-published_at')
+
+        for fields in (SUMMARY_FIELDS, READ_FIELDS, ['title', 'tags_info']):
+            legacy = JSONRenderer().render(
+                NewsSerializer(queryset.prefetch_related('tags'), many=True, fields=fields).data
+            )
+            row_serializer = NewsRowSerializer(fields)
+            fast = NewsJSONRenderer().render(row_serializer.to_representation(row_serializer.rows(queryset)))
+            self.assertEqual(fast, legacy)
+
+        response = self.client.get(f'/api/news/{self.news3.id}/', HTTP_ACCEPT='application/json')
+        self.assertEqual(response.content, JSONRenderer().render(NewsSerializer(self.news3).data))
+
+
+class AsyncNewsAPITests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        tags = [Tag.objects.create(name=name, slug=name) for name in ('technology', 'economy')]
+        for n in range(5):
+            news = News.objects.create(
+                title=f'news {n}', content=f'content {n} about markets', source=f'https://async.example/{n}',
+                published_at=timezone.now() - timedelta(hours=n), is_active=n != 3,
+            )
+            news.tags.add(*tags[:n % 3])
+        self.detail_id = News.objects.filter(is_active=True).values_list('id', flat=True).first()
+
+    def test_async_endpoints_match_sync_responses(self):
+        queries = [
+            '', '?view=full', '?page_size=2&page=2', '?page=9', '?tags=economy', '?ordering=title',
+            '?pagination=cursor&page_size=2', '?cursor=bogus', '?keyword_include=markets&ordering=relevance',
+            f'{self.detail_id}/', '9999/',
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                sync = self.client.get(f'/api/news/{query}', HTTP_ACCEPT='application/json')
+                asynchronous = self.client.get(f'/api/async/news/{query}')
+                self.assertEqual(asynchronous.status_code, sync.status_code)
+                self.assertEqual(
+                    asynchronous.content.replace(b'/api/async/news/', b'/api/news/'), sync.content,
+                )
+
+    async def test_async_view_serves_from_cache(self):
+        first = await self.async_client.get('/api/async/news/')
+        second = await self.async_client.get('/api/async/news/', headers={'If-None-Match': first['ETag']})
+        third = await self.async_client.get('/api/async/news/')
+        self.assertEqual((first['X-Cache'], second.status_code, third['X-Cache']), ('MISS', 304, 'HIT'))
+        self.assertEqual(third.content, first.content)
+
+
+@override_settings(NEWS_DB_REPLICAS={'ALIASES': ['replica'], 'STICKY_SECONDS': 5, 'RETRY_SECONDS': 30})
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        caches['default'].clear()
+        replicas.down_until.clear()
+        tag_resolver.clear()
+        published_at = timezone.now() - timedelta(days=1)
+        News.objects.create(title='on the primary', content='x', source='https://replica.example/1', published_at=published_at)
+        News.objects.using('replica').create(
+            title='on the replica', content='x', source='https://replica.example/1', published_at=published_at,
+        )
+        self.settle()
+
+    def settle(self):
+        """Pretends the last write is older than the stickiness window."""
+        caches['default'].set(MODIFIED_KEY, time.time() - 60, None)
+
+    def titles(self, response):
+        return [item['title'] for item in response.data['results']]
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        response = self.client.get('/api/news/')
+        self.assertEqual(response['X-DB-Alias'], 'replica')
+        self.assertEqual(self.titles(response), ['on the replica'])
+
+        response = self.client.post('/api/news/', {
+            'title': 'fresh write', 'content': 'y', 'source': 'https://replica.example/2',
+            'published_at': timezone.now().isoformat(), 'tags': ['economy'],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(News.objects.using('default').filter(title='fresh write').exists())
+        self.assertFalse(News.objects.using('replica').filter(title='fresh write').exists())
+
+    def test_writer_and_cache_refills_read_from_primary_after_a_write(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/news/', {
+                'title': 'fresh write', 'content': 'y', 'source': 'https://replica.example/2',
+                'published_at': timezone.now().isoformat(), 'is_active': True,
+            }, format='json')
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+        other_client = APIClient()
+        response = other_client.get('/api/news/')
+        self.assertEqual(response['X-DB-Alias'], 'default')
+
+        self.settle()
+        response = self.client.get('/api/news/', {'page': 1})
+        self.assertEqual(response['X-DB-Alias'], 'default')
+        self.assertIn('fresh write', self.titles(response))
+        response = other_client.get('/api/news/', {'page_size': 10})
+        self.assertEqual(response['X-DB-Alias'], 'replica')
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        with mock.patch.object(connections['replica'], 'ensure_connection', side_effect=OperationalError('gone')):
+            response = self.client.get('/api/news/')
+        self.assertEqual(response['X-DB-Alias'], 'default')
+        self.assertEqual(self.titles(response), ['on the primary'])
+        self.assertFalse(replicas.stats()['replica']['healthy'])
+
+        response = self.client.get('/api/news/', {'page': 1})
+        self.assertEqual(response['X-DB-Alias'], 'default')
+
+    async def test_async_view_reads_from_replica(self):
+        response = await self.async_client.get('/api/async/news/')
+        self.assertEqual(response['X-DB-Alias'], 'replica')
+        self.assertIn(b'on the replica', response.content)
+
+
+class NewsExportTests(TestCase):
+    def setUp(self):
+        tag = Tag.objects.create(name='economy', slug='economy')
+        self.base = timezone.now() - timedelta(days=1)
+        for n in range(5):
+            news = News.objects.create(
+                title=f'export {n}', content=f'content, "quoted" {n}\nsecond line', source=f'https://export.example/{n}',
+                published_at=self.base, is_active=n != 4,
+            )
+            News.objects.filter(pk=news.pk).update(updated_at=self.base + timedelta(minutes=n % 3))
+            if n % 2:
+                news.tags.add(tag)
+        self.active = News.objects.filter(is_active=True).order_by('updated_at', 'id')
+
+    def export(self, **params):
+        response = self.client.get('/api/news/export/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content)
+
+    def test_ndjson_lines_match_the_serializer(self):
+        lines = self.export().splitlines()
+        self.assertEqual(lines, [NewsJSONRenderer().render(NewsSerializer(news).data) for news in self.active])
+
+    def test_chunks_walk_updated_at_ties_without_gaps(self):
+        with self.assertNumQueries(5):
+            chunks = list(export_items(READ_FIELDS + ['tags_info'], chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2])
+        self.assertEqual([item['id'] for chunk in chunks for item in chunk], [news.id for news in self.active])
+
+    def test_since_returns_later_updates_including_deactivations(self):
+        since = self.base + timedelta(seconds=30)
+        lines = self.export(since=since.isoformat(), fields='id,title').splitlines()
+        expected = [
+            {'id': news.id, 'title': news.title, 'is_active': news.is_active}
+            for news in News.objects.order_by('updated_at', 'id') if news.updated_at > since
+        ]
+        self.assertEqual([json.loads(line) for line in lines], expected)
+        self.assertIn(False, [item['is_active'] for item in expected])
+
+    async def test_asgi_export_streams_chunk_by_chunk(self):
+        response = await self.async_client.get('/api/news/export/', {'fields': 'id'})
+        self.assertTrue(hasattr(response.streaming_content, '__aiter__'))
+        lines = b''.join([chunk async for chunk in response.streaming_content]).splitlines()
+        ids = [news.id async for news in self.active]
+        self.assertEqual([json.loads(line)['id'] for line in lines], ids)
+
+    def test_csv_export(self):
+        rows = list(csv.reader(self.export(format='csv', fields='id,content,tags_info').decode().splitlines(True)))
+        self.assertEqual(rows[0], ['id', 'content', 'tags_info'])
+        self.assertEqual(rows[1:], [
+            [str(news.id), news.content, ','.join(tag.slug for tag in news.tags.all())] for news in self.active
+        ])
+
+    def test_gzip_on_the_fly(self):
+        response = self.client.get('/api/news/export/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.export())
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.client.get('/api/news/export/', {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/news/export/', {'since': 'yesterday'}).status_code, 400)
+
+
+class NewsChangeFeedTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.news = [
+                News.objects.create(
+                    title=f'change {n}', content='x', source=f'https://changes.example/{n}',
+                    published_at=timezone.now(), is_active=n != 2,
+                )
+                for n in range(4)
+            ]
+        self.changes = dict(NewsChange.objects.values_list('news_id', 'id'))
+        self.cursor = self.changes[self.news[3].id]
+
+    def test_returns_articles_after_the_cursor_oldest_first(self):
+        after = self.changes[self.news[0].id]
+        response = self.client.get('/api/news/changes/', {'after': after, 'timeout': 0, 'fields': 'id,title'})
+        self.assertEqual(json.loads(response.content), {
+            'cursor': self.cursor,
+            'results': [{'id': news.id, 'title': news.title} for news in (self.news[1], self.news[3])],
+        })
+
+        response = self.client.get('/api/news/changes/', {'after': after, 'limit': 1, 'timeout': 0})
+        self.assertEqual(json.loads(response.content)['cursor'], self.changes[self.news[1].id])
+
+    def test_emits_activated_articles_and_skips_deactivated_ones(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.filter(pk=self.news[3].pk).update(is_active=False)
+            self.news[2].is_active = True
+            self.news[2].save()
+        response = self.client.get('/api/news/changes/', {'after': self.changes[self.news[0].id], 'timeout': 0})
+        data = json.loads(response.content)
+        self.assertEqual([item['title'] for item in data['results']], ['change 1', 'change 2'])
+        self.assertEqual(data['cursor'], NewsChange.objects.get(news=self.news[2]).id)
+
+    def test_holds_back_changes_behind_an_uncommitted_id(self):
+        # Two writers took ids cursor+1 and cursor+2; the second committed first.
+        NewsChange.objects.create(id=self.cursor + 2, news=self.news[1])
+        response = self.client.get('/api/news/changes/', {'after': self.cursor, 'timeout': 0})
+        self.assertEqual(json.loads(response.content), {'cursor': self.cursor, 'results': []})
+
+        NewsChange.objects.create(id=self.cursor + 1, news=self.news[0])
+        response = self.client.get('/api/news/changes/', {'after': self.cursor, 'timeout': 0})
+        data = json.loads(response.content)
+        self.assertEqual((data['cursor'], [item['title'] for item in data['results']]), (
+            self.cursor + 2, ['change 0', 'change 1'],
+        ))
+
+        # A gap that never fills, e.g. a rolled-back insert, is skipped once the row behind it is old enough.
+        NewsChange.objects.create(id=self.cursor + 4, news=self.news[3])
+        NewsChange.objects.filter(id=self.cursor + 4).update(created_at=timezone.now() - timedelta(minutes=1))
+        response = self.client.get('/api/news/changes/', {'after': self.cursor + 2, 'timeout': 0})
+        self.assertEqual(json.loads(response.content)['cursor'], self.cursor + 4)
+
+    def test_without_cursor_answers_with_the_current_one(self):
+        response = self.client.get('/api/news/changes/')
+        self.assertEqual(json.loads(response.content), {'cursor': self.cursor, 'results': []})
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.client.get('/api/news/changes/', {'after': 'latest'}).status_code, 400)
+
+    def test_wsgi_requests_never_wait(self):
+        started = time.monotonic()
+        with mock.patch('news.async_views.change_feed.waiter') as waiter:
+            response = self.client.get('/api/news/changes/', {'after': self.cursor, 'timeout': 10})
+        self.assertEqual(json.loads(response.content), {'cursor': self.cursor, 'results': []})
+        self.assertLess(time.monotonic() - started, 1)
+        waiter.assert_not_called()
+
+        response = self.client.get('/api/news/changes/', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 406)
+
+    async def test_long_poll_wakes_on_a_new_article(self):
+        started = time.monotonic()
+        poll = asyncio.ensure_future(self.async_client.get('/api/news/changes/', {'after': self.cursor, 'timeout': 10}))
+        await asyncio.sleep(0.2)
+        self.assertFalse(poll.done())
+        news = await News.objects.acreate(
+            title='breaking', content='x', source='https://changes.example/new', published_at=timezone.now(), is_active=True,
+        )
+        # The outbox row is written on commit, which never comes inside a TestCase.
+        change = await NewsChange.objects.acreate(news=news)
+        data = json.loads((await poll).content)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual((data['cursor'], [item['title'] for item in data['results']]), (change.id, ['breaking']))
+
+    async def test_event_stream_resumes_from_last_event_id(self):
+        response = await self.async_client.get(
+            '/api/news/changes/',
+            headers={'Accept': 'text/event-stream', 'Last-Event-ID': str(self.changes[self.news[1].id])},
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = response.streaming_content
+        self.assertEqual(await anext(events), b'retry: 2000\n\n')
+        event = await anext(events)
+        await events.aclose()
+        self.assertTrue(event.startswith(f'id: {self.cursor}\nevent: news\ndata: '.encode()))
+        self.assertEqual([item['title'] for item in json.loads(event.split(b'data: ', 1)[1])], ['change 3'])
+
+    @skipUnless(redis_available('redis://localhost:6379/15'), 'needs a Redis server')
+    async def test_publish_wakes_waiters_through_redis(self):
+        feed = ChangeFeed('redis://localhost:6379/15', channel='news:changes:test', poll_interval=5)
+        event = feed.waiter()
+        for _ in range(50):
+            if feed.listener().connected:
+                break
+            await asyncio.sleep(0.05)
+        started = time.monotonic()
+        await asyncio.get_running_loop().run_in_executor(None, feed.publish)
+        await feed.wait(event, 5)
+        self.assertLess(time.monotonic() - started, 1)
+        await feed.close()
+
+
+class TagFacetTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.ai, self.mobile, self.games = [Tag.objects.create(name=name, slug=name) for name in ('ai', 'mobile', 'games')]
+        self.now = timezone.now()
+        self.recent = News.objects.create(
+            title='recent', content='x', source='https://facets.example/recent', published_at=self.now - timedelta(hours=2),
+        )
+        self.recent.tags.add(self.ai, self.mobile)
+        self.older = News.objects.create(
+            title='older', content='x', source='https://facets.example/older', published_at=self.now - timedelta(days=3),
+        )
+        self.older.tags.add(self.ai)
+
+    def assertFacetsMatchNewsTable(self):
+        expected = contributions(
+            News.tags.through.objects.filter(news__is_active=True).values_list('tag_id', 'news__published_at')
+        )
+        stored = {(row.tag_id, row.hour): row.count for row in TagActivity.objects.all() if row.count}
+        self.assertEqual(stored, dict(expected))
+        per_tag = {}
+        for (tag_id, _), count in expected.items():
+            per_tag[tag_id] = per_tag.get(tag_id, 0) + count
+        self.assertEqual({tag.id: tag.news_count for tag in Tag.objects.all()}, {
+            tag.id: per_tag.get(tag.id, 0) for tag in Tag.objects.all()
+        })
+
+    def test_tagging_writes_keep_counts_in_step(self):
+        self.assertFacetsMatchNewsTable()
+        self.recent.tags.remove(self.mobile, self.games)
+        self.assertFacetsMatchNewsTable()
+        self.older.tags.set([self.games, self.mobile])
+        self.assertFacetsMatchNewsTable()
+        self.games.news_set.add(self.recent)
+        self.assertFacetsMatchNewsTable()
+        self.recent.tags.clear()
+        self.assertFacetsMatchNewsTable()
+        self.ai.news_set.clear()
+        self.assertFacetsMatchNewsTable()
+
+    def test_activation_dates_and_deletes_keep_counts_in_step(self):
+        self.recent.is_active = False
+        self.recent.save()
+        self.assertEqual(Tag.objects.get(pk=self.mobile.pk).news_count, 0)
+        self.assertFacetsMatchNewsTable()
+        self.recent.is_active = True
+        self.recent.published_at = self.now - timedelta(days=10)
+        self.recent.save()
+        self.assertFacetsMatchNewsTable()
+        self.older.delete()
+        self.assertFacetsMatchNewsTable()
+
+    def test_serializer_and_pipeline_writes_are_counted(self):
+        response = self.client.post('/api/news/', {
+            'title': 'posted', 'content': 'x', 'source': 'https://facets.example/posted',
+            'published_at': self.now.isoformat(), 'is_active': True, 'tags': ['games', 'new tag'],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        BatchedDjangoNewsPipeline().flush_sync([make_item(n, tags=['ai', 'games']) for n in range(3)])
+        self.assertEqual(Tag.objects.get(pk=self.games.pk).news_count, 4)
+        self.assertFacetsMatchNewsTable()
+
+    def test_endpoint_reads_only_the_aggregates(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tags/')
+        self.assertFalse([q['sql'] for q in queries.captured_queries if 'news_news' in q['sql']])
+        self.assertEqual(response.data['results'], [
+            {'id': self.ai.id, 'name': 'ai', 'slug': 'ai', 'count': 2, 'last_24h': 1, 'last_7d': 2},
+            {'id': self.mobile.id, 'name': 'mobile', 'slug': 'mobile', 'count': 1, 'last_24h': 1, 'last_7d': 1},
+        ])
+
+        response = self.client.get('/api/tags/', {'ordering': 'name', 'min_count': 0})
+        self.assertEqual([tag['name'] for tag in response.data['results']], ['ai', 'games', 'mobile'])
+        self.assertEqual(self.client.get('/api/tags/', {'min_count': 'many'}).status_code, 400)
+
+    def test_rebuild_repairs_drift(self):
+        Tag.objects.update(news_count=99)
+        TagActivity.objects.filter(tag=self.ai).delete()
+        TagActivity.objects.create(tag=self.games, hour=activity_hour(self.now), count=5)
+        call_command('rebuild_tag_facets', stdout=open(os.devnull, 'w'))
+        self.assertFacetsMatchNewsTable()
+
+
+def explain(sql):
+    """The query plan for ``sql`` as a list of dicts, in the current backend's EXPLAIN format."""
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql)
+        columns = [column[0].lower() for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def plan_problems(plan):
+    """Full table scans and sorts that no index satisfies."""
+    problems = []
+    for step in plan:
+        if connection.vendor == 'sqlite':
+            detail = step['detail']
+            if detail.startswith('SCAN ') and ' INDEX ' not in detail:
+                problems.append(f'full scan: {detail}')
+            elif 'TEMP B-TREE' in detail:
+                problems.append(f'filesort: {detail}')
+        else:
+            extra = step.get('extra') or ''
+            if step.get('type') == 'ALL':
+                problems.append(f"full scan: {step['table']}")
+            if 'filesort' in extra or 'temporary' in extra:
+                problems.append(f"filesort: {step['table']} ({extra})")
+    return problems
+
+
+@skipUnless(connection.vendor in ('sqlite', 'mysql'), 'plan checks know SQLite and MySQL EXPLAIN output')
+class QueryPlanTests(TestCase):
+    """Every list/filter query shape the API issues must be answered from an index."""
+
+    # A tag-filtered page is read through the tag -> news index and then
+    # sorted; the sort only covers that tag's articles.
+    sorted_shapes = {'tags=technology'}
+
+    @classmethod
+    def setUpTestData(cls):
+        tags = [Tag.objects.create(name=name, slug=name) for name in ('technology', 'economy', 'sport')]
+        News.objects.bulk_create([
+            News(
+                title=f'news {n}', content=f'content {n}', source=f'https://plans.example/{n}',
+                published_at=timezone.now() - timedelta(hours=n), is_active=n % 10 != 0,
+            )
+            for n in range(200)
+        ])
+        News.tags.through.objects.bulk_create([
+            News.tags.through(news_id=news_id, tag_id=tags[news_id % 3].id)
+            for news_id in News.objects.values_list('id', flat=True)
+        ])
+        cls.detail_id = News.objects.filter(is_active=True).values_list('id', flat=True).first()
+
+    def endpoint_queries(self, query):
+        url = f'/api/news/{self.detail_id}/' if query == 'detail' else f'/api/news/?{query}'
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+
+    def test_endpoint_query_shapes_use_indexes(self):
+        shapes = [
+            '', 'ordering=published_at', 'ordering=title', 'ordering=-title',
+            'pagination=cursor', 'pagination=cursor&ordering=-title',
+            'tags=technology', 'detail',
+        ]
+        for shape in shapes:
+            for sql in self.endpoint_queries(shape):
+                problems = plan_problems(explain(sql))
+                if shape in self.sorted_shapes:
+                    problems = [p for p in problems if not p.startswith('filesort')]
+                with self.subTest(shape=shape, sql=sql[:120]):
+                    self.assertEqual(problems, [])
+
+    def test_export_chunks_use_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            for _ in export_items(['id', 'title'], since=timezone.now() - timedelta(days=1), chunk_size=50):
+                pass
+        # All 200 rows, inactive ones included: four full chunks and an empty one.
+        self.assertEqual(len(queries), 5)
+        for query in queries.captured_queries:
+            with self.subTest(sql=query['sql'][:160]):
+                self.assertEqual(plan_problems(explain(query['sql'])), [])
+
+
+class TagResolverTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_resolve_creates_missing_tags_with_canonical_slugs(self):
+        resolver = TagResolver()
+        tag_ids = resolver.resolve([' هوش مصنوعی ', 'Big Data', '', 'Big Data'])
+        self.assertEqual(list(tag_ids), ['هوش مصنوعی', 'Big Data'])
+        self.assertEqual(Tag.objects.get(id=tag_ids['هوش مصنوعی']).slug, 'هوش-مصنوعی')
+        self.assertEqual(Tag.objects.get(id=tag_ids['Big Data']).slug, 'big-data')
+
+    def test_resolve_avoids_slug_collisions(self):
+        Tag.objects.create(name='big data', slug=tag_slug('big data'))
+        tag_ids = TagResolver().resolve(['Big-Data'])
+        self.assertEqual(Tag.objects.get(id=tag_ids['Big-Data']).slug, 'big-data-2')
+
+    def test_cached_names_skip_the_database(self):
+        resolver = TagResolver()
+        with self.captureOnCommitCallbacks(execute=True):
+            first = resolver.resolve(['technology', 'science'])
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.resolve(['science', 'technology']), {
+                'science': first['science'],
+                'technology': first['technology'],
+            })
+
+    def test_deleting_a_tag_invalidates_every_resolver(self):
+        resolver = TagResolver()
+        with self.captureOnCommitCallbacks(execute=True):
+            old_id = resolver.resolve(['technology'])['technology']
+        # Deleted through another resolver's process: only the shared generation tells this one.
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.get(pk=old_id).delete()
+        new_id = resolver.resolve(['technology'])['technology']
+        self.assertNotEqual(new_id, old_id)
+        self.assertTrue(Tag.objects.filter(pk=new_id, name='technology').exists())
+
+    def test_misses_recheck_stale_cached_ids(self):
+        resolver = TagResolver()
+        with self.captureOnCommitCallbacks(execute=True):
+            old_id = resolver.resolve(['technology'])['technology']
+        Tag.objects.filter(pk=old_id)._raw_delete(Tag.objects.db)
+        tag_ids = resolver.resolve(['technology', 'science'])
+        self.assertNotEqual(tag_ids['technology'], old_id)
+        self.assertEqual(Tag.objects.filter(pk__in=tag_ids.values()).count(), 2)
+
+    def test_warmed_ids_survive_the_first_resolve(self):
+        technology = Tag.objects.create(name='technology', slug='technology')
+        resolver = TagResolver()
+        with self.captureOnCommitCallbacks(execute=True):
+            resolver.warm()
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.resolve(['technology']), {'technology': technology.id})
+
+    def test_uncommitted_ids_are_not_cached(self):
+        resolver = TagResolver()
+        resolver.resolve(['technology'])
+        with self.assertNumQueries(1):
+            resolver.resolve(['technology'])
+
+
+class PersianTokenizerTests(TestCase):
+    def test_normalize_folds_arabic_letters_and_digits(self):
+        self.assertEqual(normalize('كتاب علي ۱۴۰۳'), 'کتاب علی 1403')
+
+    def test_tokenize_joins_zwnj(self):
+        self.assertEqual(tokenize('می‌شود، خبرها!'), ['میشود', 'خبرها'])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 backend requires SQLite')
+@override_settings(NEWS_SEARCH_BACKEND='news.search.SQLiteFTS5Backend')
+class SQLiteFTS5SearchTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.client = APIClient()
+        self.news = News.objects.create(
+            title="گزارش اقتصادي",
+            content="بازار سهام امروز رشد کرد",
+            source='https://test1.com/economy-fa',
+            published_at=timezone.now(),
+            is_active=True
+        )
+        News.objects.create(
+            title="sport news",
+            content="This is a news about sport.",
+            source='https://test1.com/sport',
+            published_at=timezone.now(),
+            is_active=True
+        )
+
+    def test_search_uses_fts_index(self):
+        response = self.client.get('/api/news/', {'search': 'اقتصادی'})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.news.id])
+
+    def test_index_follows_updates(self):
+        self.news.title = 'گزارش فناوری'
+        self.news.save()
+        response = self.client.get('/api/news/', {'search': 'اقتصادی'})
+        self.assertEqual(response.data['results'], [])
+        response = self.client.get('/api/news/', {'keyword_exclude': 'فناوری'})
+        self.assertEqual([item['title'] for item in response.data['results']], ['sport news'])
+
+    def test_relevance_ordering_uses_bm25(self):
+        other = News.objects.create(
+            title="سهام",
+            content="سهام و بازار سهام",
+            source='https://test1.com/stocks-fa',
+            published_at=timezone.now() - timedelta(days=1),
+            is_active=True
+        )
+        response = self.client.get('/api/news/', {'search': 'سهام', 'ordering': 'relevance'})
+        self.assertEqual([item['id'] for item in response.data['results']], [other.id, self.news.id])
+
+
+def send_stats(result_queue, size):
+    if size:
+        result_queue.put({f'stat/{n}': 'x' * 100 for n in range(size)})
+
+
+class ScrapeResultTests(TestCase):
+    def collect(self, size):
+        from billiard import Process, Queue
+
+        result_queue = Queue()
+        process = Process(target=send_stats, args=(result_queue, size))
+        process.start()
+        stats = collect_result(process, result_queue, poll_seconds=0.1)
+        process.join(5)
+        self.assertFalse(process.is_alive())
+        return stats
+
+    def test_stats_larger_than_the_pipe_buffer_do_not_deadlock(self):
+        self.assertEqual(len(self.collect(5000)), 5000)
+
+    def test_child_without_stats_gives_empty_stats(self):
+        self.assertEqual(self.collect(0), {})
+
+
+class ScrapeSchedulerTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.scheduler = ScrapeScheduler(min_interval=60, max_interval=300, heartbeat_seconds=0.05, lease_seconds=1)
+
+    def test_beats_during_a_run_coalesce_into_one_follow_up(self):
+        nested = []
+
+        def job():
+            nested.extend(self.scheduler.run(lambda: {}) for _ in range(3))
+            return {'news_pipeline/created': 4}
+
+        result = self.scheduler.run(job)
+        self.assertEqual([r['reason'] for r in nested], ['running'] * 3)
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual((result['new_items'], result['coalesced'], result['follow_up']), (4, 3, True))
+
+        follow_up = self.scheduler.run(lambda: {'news_pipeline/created': 1}, force=True)
+        self.assertEqual((follow_up['coalesced'], follow_up['follow_up']), (0, False))
+
+    def test_empty_runs_back_off_until_new_items(self):
+        self.assertEqual(self.scheduler.run(lambda: {})['next_run_in'], 120)
+        skipped = self.scheduler.run(lambda: {})
+        self.assertEqual((skipped['status'], skipped['reason']), ('skipped', 'not_due'))
+
+        result = self.scheduler.run(lambda: {}, force=True)
+        self.assertEqual((result['next_run_in'], result['skipped']), (240, 1))
+        self.assertEqual(self.scheduler.run(lambda: {}, force=True)['next_run_in'], 300)
+        self.assertEqual(self.scheduler.run(lambda: {'news_pipeline/created': 2}, force=True)['next_run_in'], 60)
+
+    def test_heartbeat_keeps_lease_alive_and_only_owner_releases(self):
+        lock = self.scheduler.lock()
+        self.assertTrue(lock.acquire())
+        with lock.heartbeat():
+            time.sleep(1.3)
+            self.assertTrue(lock.is_owned())
+
+        other = RunLock(caches['default'], lock.key)
+        self.assertFalse(other.acquire())
+        other.release()
+        self.assertTrue(lock.is_owned())
+        lock.release()
+        self.assertTrue(other.acquire())
+
+    def assertStaleHolderCannotTouchSuccessor(self, redis_url=None):
+        cache = caches['default']
+        lock = RunLock(cache, 'scrape_news:test:stale', lease_seconds=1, redis_url=redis_url)
+        self.assertTrue(lock.acquire())
+        time.sleep(1.2)
+        successor = RunLock(cache, lock.key, lease_seconds=60, redis_url=redis_url)
+        self.assertTrue(successor.acquire())
+
+        self.assertFalse(lock.renew())
+        lock.release()
+        self.assertTrue(successor.is_owned())
+        self.assertTrue(successor.renew())
+        successor.release()
+        self.assertFalse(successor.is_held())
+
+    def test_release_after_expiry_leaves_the_new_holder_alone(self):
+        self.assertStaleHolderCannotTouchSuccessor()
+
+    @skipUnless(redis_available('redis://localhost:6379/15'), 'needs a Redis server')
+    def test_redis_renew_and_release_compare_the_token_atomically(self):
+        self.assertStaleHolderCannotTouchSuccessor('redis://localhost:6379/15')
+
+    def test_failed_run_releases_lock(self):
+        def job():
+            raise RuntimeError('crawl failed')
+
+        with self.assertRaises(RuntimeError):
+            self.scheduler.run(job)
+        self.assertEqual(self.scheduler.run(lambda: {})['status'], 'completed')
@@ -1,7 +1,13 @@
 from django.urls import path, include
-from .views import NewsAPIView
+from .async_views import NewsAsyncView, NewsChangesView
+from .views import NewsAPIView, NewsExportView, TagAPIView
 
 urlpatterns = [
     path('news/', NewsAPIView.as_view(), name='news-lisr'),
     path('news/<int:pk>/', NewsAPIView.as_view(), name='news-detail'),
+    path('news/export/', NewsExportView.as_view(), name='news-export'),
+    path('news/changes/', NewsChangesView.as_view(), name='news-changes'),
+    path('tags/', TagAPIView.as_view(), name='tag-list'),
+    path('async/news/', NewsAsyncView.as_view(), name='news-async-list'),
+    path('async/news/<int:pk>/', NewsAsyncView.as_view(), name='news-async-detail'),
 ]
\ No newline at end of file
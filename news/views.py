@@ -1,64 +1,195 @@
-from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views import View
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from .cache import response_cache
+from .export import EXPORT_FORMATS, aiterate, export_stream, parse_since
+from .facets import TRENDING_WINDOWS, tag_facets
 from .models import News
-from .serializers import NewsSerializer
+from .renderers import NewsJSONRenderer
+from .serializers import NewsRowSerializer, NewsSerializer
 from .filters import NewsFilter
+from .pagination import NewsKeysetPagination, NewsPagination
+from .replicas import replicas
+from .search import get_search_backend
 
 
-class NewsPagination(PageNumberPagination):
-    page_size = 20
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+READ_FIELDS = [name for name in NewsSerializer.Meta.fields if name != 'tags']
+SUMMARY_FIELDS = [name for name in READ_FIELDS if name != 'content']
 
 
-class NewsAPIView(APIView):
+class NewsQueryMixin:
+    """Query building shared by the sync API view and its async read-only twin."""
+
     pagination_class = NewsPagination
+    cursor_pagination_class = NewsKeysetPagination
 
-    def get(self, request, pk=None, format=None):
-        if pk:
-            try:
-                news_item = News.objects.get(pk=pk, is_active=True)
-                serializer = NewsSerializer(news_item)
-                return Response(serializer.data)
-            except News.DoesNotExist:
-                return Response({'error': 'News not found'}, status=status.HTTP_404_NOT_FOUND)
+    def get_fields(self, request, detail):
+        """Fields to return: ``?fields=a,b`` picks them, ``?view=full|summary`` picks a preset.
+
+        Lists default to the summary (an excerpt instead of ``content``), the
+        detail view to everything.
+        """
+        fields = request.GET.get('fields')
+        if fields:
+            return [name for name in (f.strip() for f in fields.split(',')) if name in READ_FIELDS] or SUMMARY_FIELDS
+        view = request.GET.get('view') or ('full' if detail else 'summary')
+        return READ_FIELDS if view == 'full' else SUMMARY_FIELDS
 
-        queryset = News.objects.filter(is_active=True).order_by('-published_at')
+    def get_queryset(self):
+        return News.objects.filter(is_active=True)
+
+    def list_rows(self, request, row_serializer):
+        """The filtered, ordered row queryset for a list request and the paginator for it; nothing is evaluated."""
+        queryset = self.get_queryset().order_by('-published_at')
 
         filtered_queryset = NewsFilter(request.GET, queryset=queryset).qs
 
+        search_backend = get_search_backend(filtered_queryset.db)
         search_query = request.GET.get('search')
         if search_query:
-            filtered_queryset = filtered_queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(content__icontains=search_query)
-            )
+            filtered_queryset = search_backend.filter(filtered_queryset, search_query, match_all=True)
 
         ordering = request.GET.get('ordering')
         allowed_ordering_fields = ['published_at', '-published_at', 'title', '-title']
-        if ordering in allowed_ordering_fields:
+        rank_terms = ' '.join(filter(None, [search_query, request.GET.get('keyword_include')]))
+        if ordering == 'relevance' and rank_terms:
+            filtered_queryset = search_backend.rank(filtered_queryset, rank_terms).order_by(
+                f'-{search_backend.rank_alias}', '-published_at'
+            )
+        elif ordering in allowed_ordering_fields:
             filtered_queryset = filtered_queryset.order_by(ordering)
         else:
             filtered_queryset = filtered_queryset.order_by('-published_at')
 
-        paginator = self.pagination_class()
-        page = paginator.paginate_queryset(filtered_queryset, request)
+        if request.GET.get('pagination') == 'cursor' or 'cursor' in request.GET:
+            paginator = self.cursor_pagination_class()
+        else:
+            paginator = self.pagination_class()
+        return row_serializer.rows(filtered_queryset), paginator
+
+
+class NewsAPIView(NewsQueryMixin, APIView):
+    renderer_classes = [NewsJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request, pk=None, format=None):
+        lookup = response_cache.lookup(request)
+        if lookup.data is not None:
+            if lookup.is_not_modified(request):
+                return lookup.finalize(Response(status=status.HTTP_304_NOT_MODIFIED), 'NOT_MODIFIED')
+            return lookup.finalize(Response(lookup.data), 'HIT')
+
+        alias = replicas.choose(request, lookup.last_modified)
+        with replicas.reading_from(alias):
+            response = self.build_response(request, pk)
+        response['X-DB-Alias'] = alias
+        if response.status_code == status.HTTP_200_OK:
+            lookup.store(response.data)
+            if lookup.is_not_modified(request):
+                return lookup.finalize(Response(status=status.HTTP_304_NOT_MODIFIED), 'NOT_MODIFIED')
+        return lookup.finalize(response, 'MISS')
+
+    def build_response(self, request, pk=None):
+        row_serializer = NewsRowSerializer(self.get_fields(request, detail=bool(pk)))
+        if pk:
+            try:
+                row = row_serializer.rows(self.get_queryset()).get(pk=pk)
+            except News.DoesNotExist:
+                return Response({'error': 'News not found'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(row_serializer.to_representation([row])[0])
+
+        rows, paginator = self.list_rows(request, row_serializer)
+        page = paginator.paginate_queryset(rows, request)
 
         if page is not None:
-            serializer = NewsSerializer(page, many=True)
-            return paginator.get_paginated_response(serializer.data)
+            return paginator.get_paginated_response(row_serializer.to_representation(page))
 
-        serializer = NewsSerializer(filtered_queryset, many=True)
-        return Response(serializer.data)
+        return Response(row_serializer.to_representation(rows))
 
     def post(self, request, format=None):
         serializer = NewsSerializer(data=request.data)
         if serializer.is_valid():
             news = serializer.save()
-            return Response(NewsSerializer(news).data, status=status.HTTP_201_CREATED)
+            return replicas.pin(Response(NewsSerializer(news).data, status=status.HTTP_201_CREATED))
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class TagAPIView(APIView):
+    """Tag facets: each tag's active article ``count`` plus ``last_24h`` and ``last_7d`` counts.
+
+    Served from ``Tag.news_count`` and ``TagActivity`` alone, without reading
+    the news table. ``?ordering=`` takes ``count``, ``last_24h``, ``last_7d``
+    or ``name`` (``-`` prefix for descending; default ``-count``). Tags with
+    fewer than ``?min_count=`` articles (default 1) are left out.
+    """
+
+    renderer_classes = [NewsJSONRenderer, BrowsableAPIRenderer]
+    ordering_fields = ('name', 'count', *TRENDING_WINDOWS)
+
+    def get(self, request, format=None):
+        lookup = response_cache.lookup(request)
+        if lookup.data is not None:
+            if lookup.is_not_modified(request):
+                return lookup.finalize(Response(status=status.HTTP_304_NOT_MODIFIED), 'NOT_MODIFIED')
+            return lookup.finalize(Response(lookup.data), 'HIT')
+
+        try:
+            min_count = int(request.GET.get('min_count', 1))
+        except ValueError:
+            return Response({'error': 'min_count must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        ordering = request.GET.get('ordering', '-count')
+        if ordering.lstrip('-') not in self.ordering_fields:
+            ordering = '-count'
+
+        alias = replicas.choose(request, lookup.last_modified)
+        with replicas.reading_from(alias):
+            facets = [facet for facet in tag_facets() if facet['count'] >= min_count]
+        facets.sort(key=lambda facet: facet['name'])
+        facets.sort(key=lambda facet: facet[ordering.lstrip('-')], reverse=ordering.startswith('-'))
+
+        response = Response({'count': len(facets), 'results': facets})
+        lookup.store(response.data)
+        if lookup.is_not_modified(request):
+            return lookup.finalize(Response(status=status.HTTP_304_NOT_MODIFIED), 'NOT_MODIFIED')
+        return lookup.finalize(response, 'MISS')
+
+
+class NewsExportView(NewsQueryMixin, View):
+    """Streams every active article as NDJSON (``?format=ndjson``) or CSV (``?format=csv``).
+
+    ``?since=<ISO datetime>`` limits the export to articles updated after
+    it, for incremental pulls, inactive ones included with ``is_active``;
+    rows come in ``updated_at`` order, so the last row's ``updated_at`` is
+    the next ``since``. Takes ``?fields=`` and
+    ``?view=`` like the list, defaulting to full articles. The body is
+    gzipped on the fly for clients that accept it.
+    """
+
+    def get(self, request):
+        export_format = request.GET.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return JsonResponse({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+        since = None
+        if request.GET.get('since'):
+            try:
+                since = parse_since(request.GET['since'])
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+
+        compress = 'gzip' in request.headers.get('Accept-Encoding', '')
+        stream = export_stream(
+            export_format, self.get_fields(request, detail=True), since=since, compress=compress,
+            alias=replicas.choose(request),
+        )
+        if isinstance(request, ASGIRequest):
+            stream = aiterate(stream)
+        response = StreamingHttpResponse(stream, content_type=EXPORT_FORMATS[export_format])
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        response['Content-Disposition'] = f'attachment; filename="news.{export_format}"'
+        return response
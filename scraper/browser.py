@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.request import urlopen
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserStartupError(RuntimeError):
+    pass
+
+
+class BrowserService:
+    """A long-lived headless Chromium that crawls attach to over CDP.
+
+    Launching Chromium dominates the cost of a short crawl, so the worker
+    keeps one instance warm and hands its CDP endpoint to every run through
+    ``PLAYWRIGHT_CDP_URL``; scrapy-playwright then only opens (cheap)
+    contexts on it. The browser is recycled after ``max_pages`` pages or
+    once its process tree grows past ``max_rss_mb``, and relaunched
+    whenever a health check fails.
+    """
+
+    def __init__(self, executable_path=None, max_pages=500, max_rss_mb=1024, startup_timeout=30):
+        self.executable_path = executable_path or self.default_executable_path()
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.user_data_dir = None
+        self.cdp_url = None
+        self.pages_served = 0
+        self.launches = 0
+        self.reuses = 0
+        self.recycles = 0
+        self.startup_seconds_total = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'SCRAPER_BROWSER_POOL', {})
+        return cls(
+            executable_path=options.get('EXECUTABLE_PATH'),
+            max_pages=options.get('MAX_PAGES', 500),
+            max_rss_mb=options.get('MAX_RSS_MB', 1024),
+            startup_timeout=options.get('STARTUP_TIMEOUT', 30),
+        )
+
+    @staticmethod
+    def default_executable_path():
+        return (
+            os.getenv('PLAYWRIGHT_EXECUTABLE_PATH')
+            or shutil.which('chromium')
+            or shutil.which('chromium-browser')
+            or shutil.which('google-chrome')
+        )
+
+    def acquire(self):
+        with self._lock:
+            if self.process is not None and not self.is_healthy():
+                logger.warning("Browser failed health check, relaunching")
+                self._stop()
+            if self.process is not None and self._needs_recycle():
+                self.recycles += 1
+                self._stop()
+            if self.process is None:
+                self._start()
+            else:
+                self.reuses += 1
+            return self.cdp_url
+
+    def release(self, pages=0):
+        with self._lock:
+            self.pages_served += pages
+
+    def close(self):
+        with self._lock:
+            self._stop()
+
+    def is_healthy(self):
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            with urlopen(f'{self.cdp_url}/json/version', timeout=2) as response:
+                return 'webSocketDebuggerUrl' in json.load(response)
+        except (OSError, ValueError):
+            return False
+
+    def rss_mb(self):
+        if self.process is None:
+            return 0.0
+        total_kb = 0
+        for pid in self._process_tree(self.process.pid):
+            try:
+                for line in Path(f'/proc/{pid}/status').read_text().splitlines():
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+            except (OSError, ValueError):
+                continue
+        return total_kb / 1024
+
+    def stats(self):
+        average_startup = self.startup_seconds_total / self.launches if self.launches else 0.0
+        return {
+            'launches': self.launches,
+            'reuses': self.reuses,
+            'recycles': self.recycles,
+            'pages_served': self.pages_served,
+            'rss_mb': round(self.rss_mb(), 1),
+            'average_startup_seconds': round(average_startup, 3),
+            'startup_seconds_saved': round(average_startup * self.reuses, 3),
+        }
+
+    def _needs_recycle(self):
+        if self.max_pages and self.pages_served >= self.max_pages:
+            logger.info(f"Recycling browser after {self.pages_served} pages")
+            return True
+        rss = self.rss_mb()
+        if self.max_rss_mb and rss >= self.max_rss_mb:
+            logger.info(f"Recycling browser at {rss:.0f} MB RSS")
+            return True
+        return False
+
+    def _start(self):
+        if not self.executable_path:
+            raise BrowserStartupError("No Chromium executable found, set PLAYWRIGHT_EXECUTABLE_PATH")
+
+        started = time.perf_counter()
+        self.user_data_dir = tempfile.mkdtemp(prefix='taknews-chromium-')
+        self.process = subprocess.Popen(
+            [
+                self.executable_path,
+                '--headless=new',
+                '--no-sandbox',
+                '--disable-gpu',
+                '--disable-dev-shm-usage',
+                '--no-first-run',
+                '--remote-debugging-address=127.0.0.1',
+                '--remote-debugging-port=0',
+                f'--user-data-dir={self.user_data_dir}',
+                'about:blank',
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        port_file = Path(self.user_data_dir) / 'DevToolsActivePort'
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            if port_file.exists():
+                lines = port_file.read_text().splitlines()
+                if lines and lines[0].isdigit():
+                    self.cdp_url = f'http://127.0.0.1:{lines[0]}'
+                    if self.is_healthy():
+                        elapsed = time.perf_counter() - started
+                        self.launches += 1
+                        self.startup_seconds_total += elapsed
+                        self.pages_served = 0
+                        logger.info(f"Browser started in {elapsed:.2f}s at {self.cdp_url}")
+                        return
+            time.sleep(0.1)
+
+        self._stop()
+        raise BrowserStartupError(f"Browser did not expose a CDP endpoint within {self.startup_timeout}s")
+
+    def _stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+        self.process = None
+        self.user_data_dir = None
+        self.cdp_url = None
+
+    def _process_tree(self, pid):
+        pids = [pid]
+        for current in pids:
+            try:
+                children = Path(f'/proc/{current}/task/{current}/children').read_text().split()
+            except OSError:
+                continue
+            pids.extend(int(child) for child in children)
+        return pids
+
+
+browser_service = BrowserService.from_settings()
@@ -0,0 +1,69 @@
+import json
+import time
+import uuid
+
+import redis
+from django.conf import settings
+
+
+class CrawlQueue:
+    """Redis list of crawl jobs, fed by Celery and drained by ``run_crawler_worker``.
+
+    A source is queued at most once: jobs for a source that is already
+    waiting are dropped, so beats arriving during a crawl coalesce into a
+    single follow-up. Finished jobs leave a JSON summary under
+    ``<prefix>:result:<job id>`` for ``result_ttl`` seconds.
+    """
+
+    def __init__(self, url, prefix='crawl', result_ttl=3600):
+        self.url = url
+        self.prefix = prefix
+        self.result_ttl = result_ttl
+        self._client = None
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'SCRAPER_CRAWLER', {})
+        return cls(
+            url=options.get('REDIS_URL', 'redis://redis:6379/2'),
+            prefix=options.get('PREFIX', 'crawl'),
+            result_ttl=options.get('RESULT_TTL', 3600),
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def key(self, name):
+        return f'{self.prefix}:{name}'
+
+    def enqueue(self, source, **options):
+        """Queue a crawl of ``source``; returns the job id, or ``None`` if one is already waiting."""
+        if not self.client.sadd(self.key('queued'), source):
+            return None
+        job = {'id': uuid.uuid4().hex, 'source': source, 'options': options, 'enqueued_at': time.time()}
+        self.client.rpush(self.key('jobs'), json.dumps(job))
+        return job['id']
+
+    def pop(self, timeout=5):
+        item = self.client.blpop([self.key('jobs')], timeout=timeout)
+        if item is None:
+            return None
+        job = json.loads(item[1])
+        self.client.srem(self.key('queued'), job['source'])
+        return job
+
+    def store_result(self, job_id, result):
+        self.client.set(self.key(f'result:{job_id}'), json.dumps(result, default=str), ex=self.result_ttl)
+
+    def result(self, job_id):
+        raw = self.client.get(self.key(f'result:{job_id}'))
+        return json.loads(raw) if raw else None
+
+    def size(self):
+        return self.client.llen(self.key('jobs'))
+
+
+crawl_queue = CrawlQueue.from_settings()
@@ -0,0 +1,35 @@
+import logging
+import time
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Records how long a run took from being started to its spider opening.
+
+    ``CRAWL_STARTED_AT`` (a ``time.time()`` value) is set by whoever starts
+    the run: before forking in ``news.scraper``, or when the crawler worker
+    takes the job off the queue. The gap is stored as
+    ``crawl/startup_seconds``.
+    """
+
+    def __init__(self, crawler, started_at):
+        self.crawler = crawler
+        self.started_at = started_at
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        started_at = crawler.settings.getfloat('CRAWL_STARTED_AT')
+        if not started_at:
+            raise NotConfigured
+        extension = cls(crawler, started_at)
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        return extension
+
+    def spider_opened(self, spider):
+        startup = time.time() - self.started_at
+        self.crawler.stats.set_value('crawl/startup_seconds', round(startup, 3))
+        logger.info(f"Crawl started {startup:.2f}s after it was requested")
@@ -0,0 +1,139 @@
+import json
+import re
+from datetime import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import jdatetime
+from lxml import etree
+from parsel import Selector
+
+TEHRAN_TZ = ZoneInfo("Asia/Tehran")
+
+NEXT_DATA_XPATH = '//script[@id="__NEXT_DATA__"]/text()'
+BODY_KEYS = ('body', 'content', 'html', 'text')
+DATE_KEYS = ('publishedDate', 'publishDate', 'published_at', 'publishedAt', 'createdAt', 'date')
+JALALI_MONTHS = {
+    'فروردین': 1, 'اردیبهشت': 2, 'خرداد': 3,
+    'تیر': 4, 'مرداد': 5, 'شهریور': 6,
+    'مهر': 7, 'آبان': 8, 'آذر': 9,
+    'دی': 10, 'بهمن': 11, 'اسفند': 12,
+}
+DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', '01234567890123456789')
+JALALI_DATE_RE = re.compile(
+    r'^(?:\S+\s+)?(?P<day>\d{1,2})\s+(?P<month>\S+)\s+(?P<year>\d{4})'
+    r'(?:\s*-\s*(?P<hour>\d{1,2}):(?P<minute>\d{1,2}))?$'
+)
+
+
+def compile_selectors(selectors):
+    """Compile a source's XPath expressions once so each response only evaluates them."""
+    return {name: etree.XPath(expr, smart_strings=False) for name, expr in selectors.items()}
+
+
+def xpath_texts(xpath, response):
+    """Evaluate a compiled XPath against a response, returning strings like parsel's ``getall()``."""
+    return [
+        result if isinstance(result, str) else etree.tostring(result, encoding='unicode', with_tail=False)
+        for result in xpath(response.selector.root)
+    ]
+
+
+def xpath_first(xpath, response):
+    texts = xpath_texts(xpath, response)
+    return texts[0] if texts else None
+
+
+def clean_texts(texts):
+    return '\n'.join(filter(None, map(str.strip, texts))).replace('\u200c', '')
+
+
+def html_to_text(html):
+    return clean_texts(Selector(text=html).xpath('//body//text()').getall())
+
+
+def parse_iso_datetime(value):
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(TEHRAN_TZ).replace(tzinfo=None)
+    return parsed
+
+
+@lru_cache(maxsize=4096)
+def parse_jalali_datetime(raw):
+    """Parse Zoomit-style dates such as ``دوشنبه ۱۲ آذر ۱۴۰۳ - ۱۴:۳۰`` into a naive Gregorian datetime.
+
+    Persian and Arabic-Indic digits are accepted. An article list shares a
+    handful of timestamps, so parsed values are memoized by raw string.
+    """
+    match = JALALI_DATE_RE.match(raw.translate(DIGITS).strip())
+    if match is None:
+        return None
+    month = JALALI_MONTHS.get(match['month'])
+    if not month:
+        return None
+
+    jalali_dt = jdatetime.datetime(
+        int(match['year']), month, int(match['day']), int(match['hour'] or 0), int(match['minute'] or 0),
+    )
+    return jalali_dt.togregorian()
+
+
+def load_next_data(response):
+    raw = response.xpath(NEXT_DATA_XPATH).get()
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def find_article(data):
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get('title'), str) and any(isinstance(node.get(key), str) for key in BODY_KEYS):
+                return node
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return None
+
+
+def tag_names(tags):
+    names = []
+    for tag in tags or []:
+        if isinstance(tag, dict):
+            tag = tag.get('title') or tag.get('name')
+        if isinstance(tag, str) and tag.strip():
+            names.append(tag.strip())
+    return names
+
+
+def extract_next_data(response):
+    """Build an article item from the Next.js ``__NEXT_DATA__`` payload embedded in server-rendered pages."""
+    data = load_next_data(response)
+    article = find_article(data) if data else None
+    if article is None:
+        return None
+
+    body = next(article[key] for key in BODY_KEYS if isinstance(article.get(key), str))
+    content = html_to_text(body) if '<' in body else clean_texts(body.splitlines())
+    published_at = next(
+        (parse_iso_datetime(article[key]) for key in DATE_KEYS if isinstance(article.get(key), str)),
+        None,
+    )
+    if not content:
+        return None
+
+    return {
+        'title': article['title'].strip(),
+        'content': content,
+        'published_at': published_at,
+        'tags': tag_names(article.get('tags')),
+    }
@@ -0,0 +1,98 @@
+import hashlib
+from array import array
+from bisect import bisect_left
+from urllib.parse import urlsplit
+
+from .models import SeenURL
+from .sources import source_for_url
+
+
+def canonical_url(url):
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parts.path.rstrip('/') or '/'
+    return f'{host}{path}'
+
+
+def url_fingerprint(url):
+    digest = hashlib.blake2b(canonical_url(url).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class Frontier:
+    """The set of article URLs that have already been stored, kept across runs.
+
+    Fingerprints (64-bit hashes of the canonical URL) live in the
+    ``SeenURL`` table and are loaded once per crawl into a sorted array, so
+    checking a link costs a binary search and no query. Entries outlive the
+    ``News`` rows they came from, so deleting or deactivating an article
+    does not make the spider fetch it again.
+
+    Each entry also records its source, so a frontier built for one source
+    knows whether that source was ever crawled (``backfill``) even when
+    other sources have filled the table.
+    """
+
+    def __init__(self, source=None):
+        self.source = source
+        self._known = array('q')
+        self._scheduled = set()
+        self._source_seen = False
+
+    def load(self):
+        self._known = array('q', SeenURL.objects.order_by('fingerprint').values_list('fingerprint', flat=True))
+        if self.source is not None:
+            self._source_seen = SeenURL.objects.filter(source=self.source).exists()
+        return len(self._known)
+
+    @property
+    def backfill(self):
+        """Whether nothing from the source has been stored yet, so every archive page should be walked."""
+        if self.source is None:
+            return len(self._known) == 0
+        return not self._source_seen
+
+    def __len__(self):
+        return len(self._known)
+
+    def is_known(self, url):
+        return self._is_known(url_fingerprint(url))
+
+    def _is_known(self, fingerprint):
+        index = bisect_left(self._known, fingerprint)
+        return index < len(self._known) and self._known[index] == fingerprint
+
+    def split(self, urls):
+        """Split ``urls`` into those to schedule now and the number already stored.
+
+        Stored URLs and URLs already scheduled earlier in this run are left out
+        of the first list; only the stored ones are counted.
+        """
+        new_urls, known = [], 0
+        for url in urls:
+            fingerprint = url_fingerprint(url)
+            if self._is_known(fingerprint):
+                known += 1
+            elif fingerprint not in self._scheduled:
+                self._scheduled.add(fingerprint)
+                new_urls.append(url)
+        return new_urls, known
+
+    def filter_new(self, urls):
+        """Return the URLs that are neither stored nor already scheduled in this run, in order."""
+        return self.split(urls)[0]
+
+    @staticmethod
+    def mark_seen(urls):
+        sources = {}
+        for url in urls:
+            source = source_for_url(url)
+            sources[url_fingerprint(url)] = source.name if source else ''
+        if sources:
+            SeenURL.objects.bulk_create(
+                [SeenURL(fingerprint=fingerprint, source=source) for fingerprint, source in sources.items()],
+                ignore_conflicts=True,
+            )
+        return len(sources)
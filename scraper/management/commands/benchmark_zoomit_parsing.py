@@ -0,0 +1,112 @@
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from scrapy.http import HtmlResponse
+from scrapy.crawler import Crawler
+from scrapy.statscollectors import MemoryStatsCollector
+
+from scraper.browser import BrowserService, BrowserStartupError
+from scraper.extractors import parse_jalali_datetime
+from scraper.frontier import Frontier
+from scraper.spiders.zoomit_spider import ZoomitSpider
+
+FIXTURES_DIR = Path(__file__).resolve().parents[2] / 'fixtures' / 'zoomit'
+
+
+def current_rss_mb():
+    for line in Path('/proc/self/status').read_text().splitlines():
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class Command(BaseCommand):
+    help = 'Compares articles/sec, allocations and RSS between static HTTP parsing and browser rendering on saved fixtures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--mode', choices=['static', 'browser', 'both'], default='both')
+        parser.add_argument('--fixtures', default=str(FIXTURES_DIR))
+
+    def handle(self, *args, **options):
+        fixtures = sorted(Path(options['fixtures']).glob('article*.html'))
+        if not fixtures:
+            raise CommandError(f"No article fixtures found in {options['fixtures']}")
+
+        crawler = Crawler(ZoomitSpider)
+        crawler.stats = MemoryStatsCollector(crawler)
+        spider = ZoomitSpider.from_crawler(crawler, frontier=Frontier())
+        iterations = options['iterations']
+        results = []
+
+        if options['mode'] in ('static', 'both'):
+            results.append(self.run_static(spider, fixtures, iterations))
+        if options['mode'] in ('browser', 'both'):
+            results.append(self.run_browser(spider, fixtures, iterations))
+
+        self.stdout.write(f"{'mode':<10}{'articles':>10}{'seconds':>10}{'articles/sec':>14}{'KB/article':>12}{'rss MB':>10}")
+        for mode, pages, seconds, allocated, rss in results:
+            allocated = f'{allocated:.1f}' if allocated is not None else '-'
+            self.stdout.write(
+                f"{mode:<10}{pages:>10}{seconds:>10.2f}{pages / seconds:>14.1f}{allocated:>12}{rss:>10.1f}"
+            )
+        dates = parse_jalali_datetime.cache_info()
+        self.stdout.write(f"Jalali date cache: {dates.hits} hits, {dates.misses} misses")
+
+    def fixture_url(self, path):
+        return f'https://www.zoomit.ir/tech/{400000 + len(path.stem)}-{path.stem.replace("_", "-")}/'
+
+    def run_static(self, spider, fixtures, iterations):
+        bodies = [(self.fixture_url(path), path.read_bytes()) for path in fixtures]
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for url, body in bodies:
+                response = HtmlResponse(url=url, body=body, encoding='utf-8')
+                if spider.extract_article(response) is None:
+                    raise CommandError(f"Static parse failed for {url}")
+        elapsed = time.perf_counter() - started
+        return 'static', iterations * len(bodies), elapsed, self.allocated_kb(spider, bodies), current_rss_mb()
+
+    def allocated_kb(self, spider, bodies):
+        """Average KB allocated while parsing one article, measured on a separate traced pass."""
+        tracemalloc.start()
+        try:
+            total = 0
+            for url, body in bodies:
+                response = HtmlResponse(url=url, body=body, encoding='utf-8')
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                spider.extract_article(response)
+                total += tracemalloc.get_traced_memory()[1] - before
+        finally:
+            tracemalloc.stop()
+        return total / len(bodies) / 1024
+
+    def run_browser(self, spider, fixtures, iterations):
+        from playwright.sync_api import sync_playwright
+
+        service = BrowserService()
+        try:
+            cdp_url = service.acquire()
+        except BrowserStartupError as e:
+            raise CommandError(str(e))
+
+        try:
+            with sync_playwright() as playwright:
+                browser = playwright.chromium.connect_over_cdp(cdp_url)
+                page = browser.new_context().new_page()
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    for path in fixtures:
+                        page.goto(path.as_uri(), wait_until='load')
+                        response = HtmlResponse(url=self.fixture_url(path), body=page.content(), encoding='utf-8')
+                        if spider.extract_article(response) is None:
+                            raise CommandError(f"Rendered parse failed for {path.name}")
+                elapsed = time.perf_counter() - started
+                rss = current_rss_mb() + service.rss_mb()
+                browser.close()
+        finally:
+            service.close()
+        return 'browser', iterations * len(fixtures), elapsed, None, rss
@@ -0,0 +1,115 @@
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from scrapy.crawler import Crawler, CrawlerRunner
+from scrapy.utils.defer import deferred_from_coro
+from scrapy.utils.log import configure_logging
+from scrapy.utils.project import get_project_settings
+from scrapy.utils.reactor import install_reactor
+
+from news.scheduling import ScrapeScheduler
+from scraper.browser import BrowserStartupError, browser_service
+from scraper.crawl_queue import crawl_queue
+from scraper.frontier import Frontier
+from scraper.sources import get_source
+from scraper.spiders.news_spider import NewsSpider
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Hosts a long-lived Twisted reactor that runs crawl jobs taken from the Redis crawl queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1, help='Crawls to run at the same time')
+        parser.add_argument('--poll-timeout', type=int, default=5, help='Seconds to block waiting for a job')
+
+    def handle(self, *args, **options):
+        install_reactor('twisted.internet.asyncioreactor.AsyncioSelectorReactor')
+        from twisted.internet import defer, reactor, threads
+
+        crawl_settings = get_project_settings()
+        configure_logging(crawl_settings)
+        runner = CrawlerRunner(crawl_settings)
+        stopping = []
+
+        @defer.inlineCallbacks
+        def run_job(job):
+            picked_at = time.time()
+            source = get_source(job['source'])
+            scheduler = ScrapeScheduler.for_source(source)
+            # The same lock as scheduler.run(), so replicas and in-process crawls never overlap on a source.
+            lock = scheduler.lock()
+            if not (yield threads.deferToThread(lock.acquire)):
+                result = yield threads.deferToThread(scheduler.coalesce)
+                result.update(source=source.name, job_id=job['id'])
+                yield threads.deferToThread(crawl_queue.store_result, job['id'], result)
+                return
+            try:
+                with lock.heartbeat():
+                    stats = yield crawl(job, source, picked_at)
+                result = yield threads.deferToThread(scheduler.record, stats, time.time() - picked_at)
+                yield threads.deferToThread(scheduler.settle, result)
+            finally:
+                yield threads.deferToThread(lock.release)
+            if result['follow_up']:
+                yield threads.deferToThread(crawl_queue.enqueue, source.name, **job.get('options', {}))
+            result.update(source=source.name, job_id=job['id'], queued_seconds=round(picked_at - job['enqueued_at'], 3))
+            yield threads.deferToThread(crawl_queue.store_result, job['id'], result)
+            yield deferred_from_coro(sync_to_async(close_old_connections)())
+            logger.info(f"Crawl job finished: {result}")
+
+        @defer.inlineCallbacks
+        def crawl(job, source, picked_at):
+            job_settings = crawl_settings.copy()
+            job_settings.set('CRAWL_STARTED_AT', picked_at)
+            job_settings.set('LOG_FILE', None, priority='cmdline')
+            cdp_url = None
+            if getattr(settings, 'SCRAPER_BROWSER_POOL', {}).get('ENABLED'):
+                try:
+                    cdp_url = yield threads.deferToThread(browser_service.acquire)
+                except BrowserStartupError as e:
+                    logger.error(f"Falling back to a per-run browser: {e}")
+            if cdp_url:
+                job_settings.set('PLAYWRIGHT_CDP_URL', cdp_url)
+
+            frontier = Frontier(source.name)
+            yield deferred_from_coro(sync_to_async(frontier.load)())
+            crawler = Crawler(NewsSpider, job_settings)
+            yield runner.crawl(
+                crawler,
+                source=source.name,
+                frontier=frontier,
+                profile=source.profile or getattr(settings, 'SCRAPER_THROUGHPUT_PROFILE', None),
+                **job.get('options', {}),
+            )
+
+            stats = crawler.stats.get_stats()
+            if cdp_url:
+                browser_service.release(pages=stats.get('playwright/page_count', 0))
+            return stats
+
+        @defer.inlineCallbacks
+        def work():
+            while not stopping:
+                job = yield threads.deferToThread(crawl_queue.pop, options['poll_timeout'])
+                if job is None:
+                    continue
+                try:
+                    yield run_job(job)
+                except Exception:
+                    logger.exception(f"Crawl job {job['id']} for {job['source']} failed")
+
+        def stop():
+            stopping.append(True)
+            browser_service.close()
+
+        for _ in range(options['concurrency']):
+            reactor.callWhenRunning(work)
+        reactor.addSystemEventTrigger('before', 'shutdown', stop)
+        self.stdout.write(f"Crawler worker waiting for jobs (concurrency {options['concurrency']})")
+        reactor.run()
@@ -0,0 +1,67 @@
+import logging
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+
+def retry_after_seconds(value):
+    if not value:
+        return None
+    value = value.decode() if isinstance(value, bytes) else value
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class BackoffMiddleware:
+    """Widens a download slot's delay when the site answers 429 or 5xx.
+
+    AutoThrottle never lowers the delay on error responses, so once a slot
+    has backed off it only speeds up again as healthy responses come in.
+    ``Retry-After`` is honoured up to ``AUTOTHROTTLE_MAX_DELAY``. Runs
+    before ``RetryMiddleware``, which then re-schedules the request.
+    """
+
+    def __init__(self, crawler, http_codes, factor=2.0, min_delay=1.0, max_delay=60.0):
+        self.crawler = crawler
+        self.http_codes = set(http_codes)
+        self.factor = factor
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            crawler,
+            http_codes=[int(code) for code in settings.getlist('BACKOFF_HTTP_CODES', [429, 503])],
+            factor=settings.getfloat('BACKOFF_FACTOR', 2.0),
+            min_delay=settings.getfloat('BACKOFF_MIN_DELAY', 1.0),
+            max_delay=settings.getfloat('AUTOTHROTTLE_MAX_DELAY', 60.0),
+        )
+
+    def process_response(self, request, response, spider):
+        if response.status not in self.http_codes:
+            return response
+
+        downloader = self.crawler.engine.downloader
+        slot_key = downloader.get_slot_key(request)
+        slot = downloader.slots.get(slot_key)
+        if slot is not None:
+            delay = max(slot.delay * self.factor, self.min_delay)
+            retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            slot.delay = min(delay, self.max_delay)
+            self.crawler.stats.max_value(f'backoff/delay/{slot_key}', slot.delay)
+            logger.info(f"Got {response.status} from {request.url}, slot {slot_key} delay now {slot.delay:.2f}s")
+
+        self.crawler.stats.inc_value('backoff/count')
+        self.crawler.stats.inc_value(f'backoff/status/{response.status}')
+        return response
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:49
+
+from django.db import migrations, models
+
+from scraper.frontier import url_fingerprint
+
+
+def fill_seen_urls(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    SeenURL = apps.get_model('scraper', 'SeenURL')
+    batch = set()
+    for source in News.objects.values_list('source', flat=True).iterator(chunk_size=1000):
+        batch.add(url_fingerprint(source))
+        if len(batch) >= 1000:
+            SeenURL.objects.bulk_create([SeenURL(fingerprint=f) for f in batch], ignore_conflicts=True)
+            batch = set()
+    if batch:
+        SeenURL.objects.bulk_create([SeenURL(fingerprint=f) for f in batch], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('news', '0003_news_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeenURL',
+            fields=[
+                ('fingerprint', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('first_seen_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(fill_seen_urls, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:52
+
+from django.db import migrations, models
+
+from scraper.frontier import url_fingerprint
+from scraper.sources import source_for_url
+
+
+def fill_sources(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    SeenURL = apps.get_model('scraper', 'SeenURL')
+    batches = {}
+    for url in News.objects.values_list('source', flat=True).iterator(chunk_size=1000):
+        source = source_for_url(url)
+        if source is None:
+            continue
+        batch = batches.setdefault(source.name, [])
+        batch.append(url_fingerprint(url))
+        if len(batch) >= 1000:
+            SeenURL.objects.filter(fingerprint__in=batch).update(source=source.name)
+            batch.clear()
+    for name, batch in batches.items():
+        if batch:
+            SeenURL.objects.filter(fingerprint__in=batch).update(source=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_news_change_outbox'),
+        ('scraper', '0001_seen_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seenurl',
+            name='source',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=50),
+        ),
+        migrations.RunPython(fill_sources, migrations.RunPython.noop),
+    ]
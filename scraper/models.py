@@ -0,0 +1,11 @@
+from django.db import models
+
+
+class SeenURL(models.Model):
+    fingerprint = models.BigIntegerField(primary_key=True)
+    first_seen_at = models.DateTimeField(auto_now_add=True)
+    # Name of the registered source the URL belongs to; blank for other hosts.
+    source = models.CharField(max_length=50, blank=True, default='', db_index=True)
+
+    def __str__(self):
+        return str(self.fingerprint)
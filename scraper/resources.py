@@ -0,0 +1,61 @@
+from urllib.parse import urlsplit
+
+DEFAULT_BLOCKED_RESOURCE_TYPES = ('image', 'media', 'font', 'stylesheet')
+
+
+class ResourcePolicy:
+    """Decides which sub-resources a rendered page may load.
+
+    Archive pages are only read for their links, so images, media, fonts,
+    stylesheets and anything served from outside ``allowed_domains`` are
+    aborted before they hit the network.
+    """
+
+    def __init__(self, blocked_resource_types=DEFAULT_BLOCKED_RESOURCE_TYPES, allowed_domains=()):
+        self.blocked_resource_types = frozenset(blocked_resource_types)
+        self.allowed_domains = tuple(domain.lower().lstrip('.') for domain in allowed_domains)
+
+    @classmethod
+    def from_settings(cls, settings, allowed_domains=()):
+        return cls(
+            blocked_resource_types=settings.getlist('ARCHIVE_BLOCKED_RESOURCE_TYPES', DEFAULT_BLOCKED_RESOURCE_TYPES),
+            allowed_domains=settings.getlist('ARCHIVE_ALLOWED_RESOURCE_DOMAINS') or allowed_domains,
+        )
+
+    def is_first_party(self, url):
+        host = (urlsplit(url).hostname or '').lower()
+        if not host or not self.allowed_domains:
+            return True
+        return any(host == domain or host.endswith(f'.{domain}') for domain in self.allowed_domains)
+
+    def block_reason(self, resource_type, url):
+        if resource_type == 'document':
+            return None
+        if resource_type in self.blocked_resource_types:
+            return resource_type
+        if not self.is_first_party(url):
+            return 'third_party'
+        return None
+
+
+async def init_page(page, request):
+    """``playwright_page_init_callback`` applying the request's ``ResourcePolicy`` and counting traffic."""
+    policy = request.meta['resource_policy']
+    stats = request.meta.setdefault('resource_stats', {'blocked': 0, 'allowed': 0, 'bytes': 0, 'reasons': {}})
+
+    async def route_request(route):
+        reason = policy.block_reason(route.request.resource_type, route.request.url)
+        if reason is None:
+            stats['allowed'] += 1
+            await route.continue_()
+        else:
+            stats['blocked'] += 1
+            stats['reasons'][reason] = stats['reasons'].get(reason, 0) + 1
+            await route.abort('blockedbyclient')
+
+    async def request_finished(finished_request):
+        sizes = await finished_request.sizes()
+        stats['bytes'] += sizes['responseHeadersSize'] + sizes['responseBodySize']
+
+    await page.route('**/*', route_request)
+    page.on('requestfinished', request_finished)
@@ -0,0 +1,131 @@
+import re
+from functools import cached_property
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from scraper.extractors import compile_selectors
+
+
+class NewsSource:
+    """Everything the generic ``NewsSpider`` needs to know about one site.
+
+    ``archive_path`` is formatted with ``page``; ``article_path`` is a regex
+    matched against the path of links on the site's own hosts. ``selectors``
+    maps ``title``, ``content``, ``published_at`` and ``tags`` to XPath
+    expressions, and ``date_parser`` (a callable or dotted path) turns the
+    raw ``published_at`` text into a naive Tehran datetime. Sources that
+    render with Next.js can fall back to ``__NEXT_DATA__`` with ``next_data``.
+
+    Each source is scraped by its own Celery task on ``queue``, at most once
+    per ``min_interval`` seconds, with its own throughput ``profile``.
+    """
+
+    def __init__(self, name, base_url, archive_path, article_path, selectors, date_parser=None,
+                 render_archive=True, render_articles='hybrid', next_data=False, max_pages=10,
+                 queue='scraping', min_interval=60, profile=None):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.archive_path = archive_path
+        self.article_path = re.compile(article_path)
+        self.selectors = selectors
+        self.date_parser = date_parser
+        self.render_archive = render_archive
+        self.render_articles = render_articles
+        self.next_data = next_data
+        self.max_pages = max_pages
+        self.queue = queue
+        self.min_interval = min_interval
+        self.profile = profile
+
+    def __repr__(self):
+        return f'<NewsSource {self.name}>'
+
+    @cached_property
+    def xpaths(self):
+        return compile_selectors(self.selectors)
+
+    @property
+    def domain(self):
+        host = urlsplit(self.base_url).hostname
+        return host[4:] if host.startswith('www.') else host
+
+    def with_base_url(self, base_url):
+        """The same source served from another origin, e.g. a local mirror in tests."""
+        source = NewsSource.__new__(NewsSource)
+        source.__dict__.update(self.__dict__)
+        source.base_url = base_url.rstrip('/')
+        return source
+
+    def archive_url(self, page):
+        return self.base_url + self.archive_path.format(page=page)
+
+    def is_article_url(self, url):
+        parts = urlsplit(url)
+        host = parts.hostname or ''
+        return (
+            parts.scheme in ('http', 'https')
+            and (host == self.domain or host.endswith(f'.{self.domain}'))
+            and self.article_path.match(parts.path) is not None
+        )
+
+    def parse_date(self, raw):
+        parser = self.date_parser
+        if parser is None or not raw:
+            return None
+        if isinstance(parser, str):
+            parser = self.date_parser = import_string(parser)
+        return parser(raw)
+
+
+ZOOMIT = NewsSource(
+    name='zoomit',
+    base_url='https://www.zoomit.ir',
+    archive_path='/archive/?pageNumber={page}',
+    article_path=r'^/[^/]+/\d{5,}-[a-z0-9-]+/?$',
+    selectors={
+        'title': '//h1/text()',
+        'content': (
+            '//*[@id="__next"]/div[2]/div[1]/main/article/div/div[3]/div/div//text()'
+            ' | //*[@id="__next"]/div[2]/div[1]/main/article/div/div[5]/div/div/div//text()'
+        ),
+        'published_at': '//*[@id="__next"]/div[2]/div[1]/main/article/header/div/div/div[2]/span[1]//text()',
+        'tags': '//*[@id="__next"]/div[2]/div[1]/main/article/header/div/div/div[2]/div[1]/a/span//text()',
+    },
+    date_parser='scraper.extractors.parse_jalali_datetime',
+    render_archive=True,
+    render_articles='hybrid',
+    next_data=True,
+)
+
+SOURCES = {}
+
+
+def register(source):
+    SOURCES[source.name] = source
+    return source
+
+
+def get_source(name):
+    try:
+        return SOURCES[name]
+    except KeyError:
+        raise ValueError(f"Unknown news source {name!r}, expected one of {sorted(SOURCES)}") from None
+
+
+def source_for_url(url):
+    """The registered source whose site ``url`` is on, or ``None``."""
+    host = (urlsplit(url).hostname or '').lower()
+    for source in SOURCES.values():
+        if host == source.domain or host.endswith(f'.{source.domain}'):
+            return source
+    return None
+
+
+def enabled_sources():
+    names = getattr(settings, 'SCRAPER_SOURCES', None) or sorted(SOURCES)
+    return [get_source(name) for name in names]
+
+
+register(ZOOMIT)
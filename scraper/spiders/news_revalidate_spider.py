@@ -0,0 +1,123 @@
+import re
+from datetime import timedelta
+
+import scrapy
+from django.utils import timezone
+from news.models import News
+from scraper.spiders.news_spider import NewsSpider
+
+
+class NewsRevalidateSpider(NewsSpider):
+    """Re-checks recently published articles and passes on only the ones that changed.
+
+    Each article is requested with ``If-None-Match``/``If-Modified-Since``
+    built from the stored validators; a 304 costs no body and no write. A
+    full response is re-extracted and compared against the stored content
+    hash, and only a differing hash is handed to ``RevalidationPipeline``;
+    an unchanged article served with new validators only has those stored.
+    At most ``budget`` articles are checked per run, newest first.
+    """
+
+    name = 'news_revalidate'
+
+    custom_settings = {
+        **NewsSpider.custom_settings,
+        'ITEM_PIPELINES': {
+            'scraper.pipelines.RevalidationPipeline': 300
+        },
+        'LOG_FILE': 'logs/news_revalidation.log',
+    }
+
+    def __init__(self, *args, budget=100, since_days=7, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.budget = int(budget)
+        self.since_days = int(since_days)
+        recent = News.objects.filter(
+            published_at__gte=timezone.now() - timedelta(days=self.since_days),
+            source__iregex=rf'^https?://([a-z0-9-]+\.)*{re.escape(self.source.domain)}/',
+        )
+        self.candidates = list(
+            recent.order_by('-published_at').values('id', 'source', 'etag', 'last_modified', 'content_hash')[:self.budget]
+        )
+        self.over_budget = max(recent.count() - len(self.candidates), 0)
+
+    def start_requests(self):
+        stats = self.crawler.stats
+        stats.set_value('revalidate/budget', self.budget)
+        stats.set_value('revalidate/candidates', len(self.candidates))
+        stats.set_value('revalidate/over_budget', self.over_budget)
+        for news in self.candidates:
+            yield self.revalidation_request(news)
+
+    def revalidation_request(self, news):
+        headers = {}
+        if news['etag']:
+            headers['If-None-Match'] = news['etag']
+        if news['last_modified']:
+            headers['If-Modified-Since'] = news['last_modified']
+        return scrapy.Request(
+            news['source'],
+            callback=self.parse_revalidation,
+            headers=headers,
+            dont_filter=True,
+            meta={
+                'playwright': False,
+                'download_slot': self.http_slot,
+                'handle_httpstatus_list': [304],
+                'news': news,
+            },
+        )
+
+    def parse_revalidation(self, response):
+        news = response.meta['news']
+        stats = self.crawler.stats
+        stats.inc_value('revalidate/fetched')
+        if response.status == 304:
+            stats.inc_value('revalidate/not_modified')
+            return
+
+        item = self.extract_article(response)
+        if item is None:
+            stats.inc_value('revalidate/unparsed')
+            self.logger.warning(f"Could not extract article: {response.url}")
+            return
+
+        validators = self.response_validators(response)
+        if News.hash_content(item['title'], item['content']) == news['content_hash']:
+            stats.inc_value('revalidate/unchanged')
+            # Without the new validators every later run would pay for a full response again.
+            refreshed = {name: value for name, value in validators.items() if value and value != news[name]}
+            if refreshed:
+                stats.inc_value('revalidate/validators_refreshed')
+                yield {'source': news['source'], 'news_id': news['id'], 'validators': refreshed}
+            return
+
+        stats.inc_value('revalidate/changed')
+        yield {
+            **item,
+            **validators,
+            'source': news['source'],
+            'news_id': news['id'],
+        }
+
+    def closed(self, reason):
+        stats = self.crawler.stats
+        not_modified = stats.get_value('revalidate/not_modified', 0)
+        unchanged = stats.get_value('revalidate/unchanged', 0)
+        stats.set_value('revalidate/fetches_saved', not_modified)
+        stats.set_value('revalidate/writes_saved', not_modified + unchanged)
+        self.logger.info(
+            f"Revalidated {stats.get_value('revalidate/fetched', 0)} of {len(self.candidates)} articles: "
+            f"{stats.get_value('revalidate/changed', 0)} changed, {not_modified} not modified, {unchanged} unchanged "
+            f"({self.over_budget} left over budget)"
+        )
+
+
+class ZoomitRevalidateSpider(NewsRevalidateSpider):
+    name = 'zoomit_revalidate'
+    source_name = 'zoomit'
+
+    custom_settings = {
+        **NewsRevalidateSpider.custom_settings,
+        'LOG_FILE': 'logs/zoomit_revalidation.log',
+    }
@@ -0,0 +1,208 @@
+from urllib.parse import urljoin, urlsplit
+import scrapy
+from scraper.extractors import clean_texts, extract_next_data, xpath_first, xpath_texts
+from scraper.frontier import Frontier, canonical_url
+from scraper.resources import ResourcePolicy
+from scraper.sources import get_source
+from scraper.throughput import browser_slot, http_slot, throughput_settings
+
+
+class NewsSpider(scrapy.Spider):
+    """Crawls one registered ``NewsSource``: archive pages first, then every unseen article on them."""
+
+    name = 'news'
+    source_name = None
+
+    custom_settings = {
+        'ITEM_PIPELINES': {
+            'scraper.pipelines.BatchedDjangoNewsPipeline': 300
+        },
+        'NEWS_PIPELINE_BATCH_SIZE': 50,
+        'NEWS_PIPELINE_FLUSH_INTERVAL': 5.0,
+        'DOWNLOADER_MIDDLEWARES': {
+            'scraper.middlewares.BackoffMiddleware': 560,
+        },
+        'EXTENSIONS': {
+            'scraper.extensions.StartupTimer': 0,
+        },
+        'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'LOG_LEVEL': 'INFO',
+        'LOG_FILE': 'logs/news_scraping.log',
+        'DOWNLOAD_HANDLERS': {
+            "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
+            "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
+        },
+        'TWISTED_REACTOR': "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
+        'ARCHIVE_BLOCKED_RESOURCE_TYPES': ['image', 'media', 'font', 'stylesheet'],
+        'ARCHIVE_WAIT_UNTIL': 'domcontentloaded',
+    }
+
+    render_modes = ('hybrid', 'browser')
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, profile=None, browser_concurrency=None, http_concurrency=None, **kwargs):
+        crawler.settings.update(
+            throughput_settings(
+                kwargs.get('source') or cls.source_name, profile,
+                browser_concurrency=browser_concurrency, http_concurrency=http_concurrency,
+            ),
+            priority='spider',
+        )
+        return super().from_crawler(crawler, *args, **kwargs)
+
+    def __init__(self, *args, source=None, render_mode=None, base_url=None, max_pages=None, frontier=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.source = get_source(source or self.source_name)
+        if base_url:
+            self.source = self.source.with_base_url(base_url)
+        render_mode = render_mode or self.source.render_articles
+        if render_mode not in self.render_modes:
+            raise ValueError(f"render_mode must be one of {self.render_modes}, got {render_mode!r}")
+        self.render_mode = render_mode
+        self.allowed_domains = [urlsplit(self.source.base_url).hostname.removeprefix('www.')]
+        self.browser_slot = browser_slot(self.source.name)
+        self.http_slot = http_slot(self.source.name)
+        if frontier is None:
+            frontier = Frontier(self.source.name)
+            frontier.load()
+        self.frontier = frontier
+        self.backfill = frontier.backfill
+        self.current_page = 1
+        self.max_pages = int(max_pages or self.source.max_pages)
+
+    @property
+    def resource_policy(self):
+        if not hasattr(self, '_resource_policy'):
+            self._resource_policy = ResourcePolicy.from_settings(self.settings, self.allowed_domains)
+        return self._resource_policy
+
+    def archive_request(self, page, dont_filter=False):
+        return scrapy.Request(
+            url=self.source.archive_url(page),
+            callback=self.parse_archive,
+            meta={
+                'playwright': self.source.render_archive,
+                'download_slot': self.browser_slot if self.source.render_archive else self.http_slot,
+                'page_number': page,
+                'playwright_page_goto_kwargs': {
+                    'wait_until': self.settings.get('ARCHIVE_WAIT_UNTIL', 'domcontentloaded'),
+                },
+                'playwright_page_init_callback': 'scraper.resources.init_page',
+                'resource_policy': self.resource_policy,
+            },
+            dont_filter=dont_filter
+        )
+
+    def start_requests(self):
+        if self.backfill:
+            for page in range(1, self.max_pages + 1):
+                yield self.archive_request(page)
+
+        else:
+            yield self.archive_request(self.current_page, dont_filter=True)
+
+    def parse_archive(self, response):
+        page_number = response.meta["page_number"]
+        self.logger.info(f"Archive page {page_number}: {response.url}")
+        self.log_resource_stats(response)
+
+        article_links = {}
+        for href in response.css("a::attr(href)").getall():
+            if not href:
+                continue
+            href = self.clean_url(response.url, href)
+            if self.source.is_article_url(href):
+                article_links.setdefault(canonical_url(href), href)
+
+        scheduled, known = self.frontier.split(article_links.values())
+        self.log_link_stats(page_number, found=len(article_links), known=known, scheduled=len(scheduled))
+        for link in reversed(scheduled):
+            yield self.article_request(link)
+
+        if not scheduled:
+            self.logger.info(f"Archive page {page_number} has no unseen articles. Stopping...")
+            return
+
+        if not self.backfill and self.current_page < self.max_pages:
+            self.current_page += 1
+            yield self.archive_request(self.current_page, dont_filter=True)
+
+    def log_link_stats(self, page_number, found, known, scheduled):
+        """Unique article links on a page: ``new`` were never stored, ``scheduled`` were not already requested this run."""
+        counts = {'found': found, 'new': found - known, 'known': known, 'scheduled': scheduled}
+        for name, count in counts.items():
+            self.crawler.stats.inc_value(f'{self.source.name}/archive/links_{name}', count)
+        self.logger.info(
+            f"Archive page {page_number}: {found} article links, {found - known} new, "
+            f"{known} known, {scheduled} scheduled"
+        )
+
+    def log_resource_stats(self, response):
+        resource_stats = response.meta.get('resource_stats')
+        if not resource_stats:
+            return
+        stats = self.crawler.stats
+        stats.inc_value(f'{self.source.name}/archive/resources_blocked', resource_stats['blocked'])
+        stats.inc_value(f'{self.source.name}/archive/resources_allowed', resource_stats['allowed'])
+        stats.inc_value(f'{self.source.name}/archive/bytes_received', resource_stats['bytes'])
+        for reason, count in resource_stats['reasons'].items():
+            stats.inc_value(f'{self.source.name}/archive/resources_blocked/{reason}', count)
+        self.logger.info(
+            f"Archive page {response.meta['page_number']}: blocked {resource_stats['blocked']} requests "
+            f"{resource_stats['reasons']}, loaded {resource_stats['allowed']} ({resource_stats['bytes']} bytes)"
+        )
+
+    def article_request(self, url):
+        playwright = self.render_mode == 'browser'
+        return scrapy.Request(
+            url,
+            callback=self.parse_news,
+            meta={'playwright': playwright, 'download_slot': self.browser_slot if playwright else self.http_slot},
+        )
+
+    def parse_news(self, response):
+        item = self.extract_article(response)
+        if item is not None:
+            yield {**item, **self.response_validators(response)}
+        elif not response.meta.get('playwright'):
+            self.crawler.stats.inc_value(f'{self.source.name}/articles/browser_fallback')
+            self.logger.info(f"Static parse empty, rendering with browser: {response.url}")
+            yield response.request.replace(
+                meta={**response.meta, 'playwright': True, 'download_slot': self.browser_slot},
+                dont_filter=True,
+            )
+        else:
+            self.crawler.stats.inc_value(f'{self.source.name}/articles/unparsed')
+            self.logger.warning(f"Could not extract article: {response.url}")
+
+    def extract_article(self, response):
+        xpaths = self.source.xpaths
+        title = xpath_first(xpaths['title'], response)
+        content = clean_texts(xpath_texts(xpaths['content'], response))
+        if title and content:
+            self.crawler.stats.inc_value(f'{self.source.name}/articles/dom')
+            return {
+                'title': title,
+                'content': content,
+                'source': response.url,
+                'published_at': self.source.parse_date(xpath_first(xpaths['published_at'], response)),
+                'is_active': True,
+                'tags': xpath_texts(xpaths['tags'], response),
+            }
+
+        data = extract_next_data(response) if self.source.next_data else None
+        if data is not None:
+            self.crawler.stats.inc_value(f'{self.source.name}/articles/next_data')
+            return {**data, 'source': response.url, 'is_active': True}
+        return None
+
+    def response_validators(self, response):
+        return {
+            'etag': response.headers.get('ETag', b'').decode('latin-1'),
+            'last_modified': response.headers.get('Last-Modified', b'').decode('latin-1'),
+        }
+
+    def clean_url(self, base, href):
+        if href.startswith("/"):
+            href = urljoin(base, href)
+        return href.split("#")[0].strip()
@@ -1,3 +1,734 @@
-from django.test import TestCase
+import asyncio
+import os
+import stat
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from pathlib import Path
+
+import scrapy
+
+from unittest import mock, skipUnless
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from scrapy.http import HtmlResponse
+from scrapy import signals
+from scrapy.crawler import Crawler, CrawlerProcess
+from scrapy.settings import Settings
+from scrapy.exceptions import NotConfigured
+from scrapy.statscollectors import MemoryStatsCollector
+
+from news.models import News, NewsChange, Tag
+from news.scheduling import ScrapeScheduler
+from scraper.browser import BrowserService
+from scraper.crawl_queue import CrawlQueue
+from scraper.extensions import StartupTimer
+from scraper.extractors import parse_jalali_datetime, xpath_texts
+from scraper.frontier import Frontier, canonical_url, url_fingerprint
+from scraper.models import SeenURL
+from scraper.pipelines import BatchedDjangoNewsPipeline, RevalidationPipeline
+from scraper.resources import ResourcePolicy, init_page
+from scraper.spiders.news_revalidate_spider import ZoomitRevalidateSpider
+from scraper.sources import NewsSource, SOURCES, get_source, register
+from scraper.spiders.news_spider import NewsSpider
+from scraper.spiders.zoomit_spider import ZoomitSpider
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures' / 'zoomit'
+
+FAKE_CHROMIUM = textwrap.dedent('''\
+    #!{python}
+    import json, sys
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from pathlib import Path
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps({{'webSocketDebuggerUrl': 'ws://fake'}}).encode()
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    user_data_dir = next(a.split('=', 1)[1] for a in sys.argv if a.startswith('--user-data-dir='))
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    Path(user_data_dir, 'DevToolsActivePort').write_text(f'{{server.server_port}}\\n/devtools/browser/fake\\n')
+    server.serve_forever()
+''')
+
+
+def redis_available(url):
+    try:
+        return CrawlQueue(url).client.ping()
+    except Exception:
+        return False
+
+
+def make_item(n, tags=()):
+    return {
+        'title': f'News {n}',
+        'content': f'Content {n}',
+        'source': f'https://www.zoomit.ir/tech/{10000 + n}-news-{n}/',
+        'published_at': datetime(2025, 7, 1, 10, n % 60),
+        'is_active': True,
+        'tags': list(tags),
+    }
+
+
+def make_spider(spidercls=ZoomitSpider, **kwargs):
+    crawler = Crawler(spidercls)
+    crawler.stats = MemoryStatsCollector(crawler)
+    return spidercls.from_crawler(crawler, **kwargs)
+
+
+def fixture_response(name, url='https://www.zoomit.ir/tech/412345-fixture/'):
+    return HtmlResponse(
+        url=url,
+        body=(FIXTURES_DIR / name).read_bytes(),
+        encoding='utf-8',
+        request=scrapy.Request(url, meta={'playwright': False}),
+    )
+
+
+class MockZoomitServer:
+    """A local stand-in for zoomit.ir serving archive pages and fixture articles.
+
+    Tracks how many archive and article requests are in flight at once and
+    can answer chosen paths with a 429 the first time they are requested.
+    """
+
+    def __init__(self, pages=3, per_page=6, latency=0.2, throttled_paths=()):
+        self.pages = pages
+        self.per_page = per_page
+        self.latency = latency
+        self.throttled_paths = set(throttled_paths)
+        self.article_body = (FIXTURES_DIR / 'article.html').read_bytes()
+        self.in_flight = {'archive': 0, 'article': 0}
+        self.max_in_flight = {'archive': 0, 'article': 0}
+        self.hits = {}
+        self._lock = threading.Lock()
+
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                mock.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def article_path(self, page, index):
+        return f'/tech/{100000 + page * 100 + index}-article-{page}-{index}/'
+
+    def archive_html(self, page):
+        links = ''
+        if page <= self.pages:
+            links = ''.join(f'<a href="{self.article_path(page, i)}">Article</a>' for i in range(self.per_page))
+        return f'<html><body><a href="/about/">About</a>{links}</body></html>'.encode()
+
+    def handle(self, handler):
+        path = handler.path
+        kind = 'archive' if path.startswith('/archive/') else 'article'
+        with self._lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+            first_hit = self.hits[path] == 1
+            self.in_flight[kind] += 1
+            self.max_in_flight[kind] = max(self.max_in_flight[kind], self.in_flight[kind])
+        try:
+            time.sleep(self.latency)
+            if path in self.throttled_paths and first_hit:
+                handler.send_response(429)
+                handler.send_header('Retry-After', '0')
+                handler.end_headers()
+                return
+            if kind == 'archive':
+                body = self.archive_html(int(path.rsplit('=', 1)[1]))
+            else:
+                body = self.article_body
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'text/html; charset=utf-8')
+            handler.send_header('Content-Length', str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        finally:
+            with self._lock:
+                self.in_flight[kind] -= 1
+
+
+def crawl_mock_zoomit(server, **spider_kwargs):
+    """Run ``ZoomitSpider`` against ``server`` over plain HTTP and return (items, stats)."""
+    settings = Settings()
+    settings.setdict({
+        'DOWNLOAD_HANDLERS': {'http': 'scrapy.core.downloader.handlers.http.HTTPDownloadHandler'},
+        'ITEM_PIPELINES': {},
+        'LOG_FILE': None,
+        'LOG_LEVEL': 'ERROR',
+        'RETRY_TIMES': 3,
+    }, priority='cmdline')
+    process = CrawlerProcess(settings, install_root_handler=False)
+    crawler = process.create_crawler(ZoomitSpider)
+    items = []
+    crawler.signals.connect(lambda item: items.append(item), signal=signals.item_scraped, weak=False)
+    process.crawl(crawler, base_url=server.base_url, **spider_kwargs)
+    process.start()
+    return items, crawler.stats.get_stats()
+
+
+class ThroughputProfileTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with MockZoomitServer(throttled_paths=['/tech/100201-article-2-1/']) as server:
+            cls.server = server
+            started = time.perf_counter()
+            cls.items, cls.stats = crawl_mock_zoomit(
+                server, profile='fast', browser_concurrency='2', http_concurrency='3', max_pages='3',
+            )
+            cls.elapsed = time.perf_counter() - started
+
+    def test_profile_settings_and_slot_routing(self):
+        spider = make_spider(profile='polite')
+        self.assertEqual(spider.settings.getfloat('DOWNLOAD_DELAY'), 1.0)
+        self.assertEqual(spider.settings.getdict('DOWNLOAD_SLOTS')['zoomit-http']['concurrency'], 1)
+
+        spider = make_spider(http_concurrency='6')
+        self.assertTrue(spider.settings.getbool('AUTOTHROTTLE_ENABLED'))
+        self.assertEqual(spider.settings.getdict('DOWNLOAD_SLOTS')['zoomit-http']['concurrency'], 6)
+        self.assertEqual(spider.archive_request(1).meta['download_slot'], 'zoomit-browser')
+        self.assertEqual(spider.article_request('https://www.zoomit.ir/tech/412345-x/').meta['download_slot'], 'zoomit-http')
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(ValueError):
+            make_spider(profile='reckless')
+
+    def test_crawl_respects_per_slot_concurrency(self):
+        self.assertEqual(len(self.items), 18)
+        self.assertEqual(self.server.max_in_flight['archive'], 2)
+        self.assertGreater(self.server.max_in_flight['article'], 1)
+        self.assertLessEqual(self.server.max_in_flight['article'], 3)
+
+    def test_throttled_response_backs_off_and_retries(self):
+        self.assertEqual(self.stats['backoff/count'], 1)
+        self.assertEqual(self.stats['backoff/status/429'], 1)
+        self.assertGreaterEqual(self.stats['backoff/delay/zoomit-http'], 1.0)
+        self.assertEqual(self.server.hits['/tech/100201-article-2-1/'], 2)
+
+
+def archive_response(page, links):
+    url = f'https://www.zoomit.ir/archive/?pageNumber={page}'
+    body = ''.join(f'<a href="{link}">Article</a>' for link in links)
+    return HtmlResponse(
+        url=url,
+        body=f'<html><body>{body}</body></html>'.encode(),
+        encoding='utf-8',
+        request=scrapy.Request(url, meta={'page_number': page}),
+    )
+
+
+class FrontierTests(TestCase):
+    def test_canonical_url_ignores_www_fragment_and_trailing_slash(self):
+        self.assertEqual(canonical_url('https://www.Zoomit.ir/tech/12345-a/#comments'), 'zoomit.ir/tech/12345-a')
+        self.assertEqual(canonical_url('http://zoomit.ir/tech/12345-a'), 'zoomit.ir/tech/12345-a')
+
+    def test_seen_urls_survive_news_deletion(self):
+        BatchedDjangoNewsPipeline().flush_sync([make_item(1), make_item(2)])
+        News.objects.all().delete()
+
+        frontier = Frontier()
+        self.assertEqual(frontier.load(), 2)
+        self.assertTrue(frontier.is_known(make_item(1)['source'].rstrip('/')))
+        new = frontier.filter_new([make_item(1)['source'], make_item(3)['source'], make_item(3)['source']])
+        self.assertEqual(new, [make_item(3)['source']])
+        self.assertEqual(frontier.filter_new([make_item(3)['source']]), [])
+
+    def test_spider_stops_on_page_of_known_articles(self):
+        known = [f'/tech/{20000 + n}-known-{n}/' for n in range(3)]
+        Frontier.mark_seen(f'https://www.zoomit.ir{path}' for path in known)
+        spider = make_spider()
+        self.assertFalse(spider.backfill)
+        self.assertEqual([r.meta['page_number'] for r in spider.start_requests()], [1])
+
+        requests = list(spider.parse_archive(archive_response(1, ['/tech/30000-fresh/', *known[:2]])))
+        self.assertEqual([r.url for r in requests], [
+            'https://www.zoomit.ir/tech/30000-fresh/',
+            'https://www.zoomit.ir/archive/?pageNumber=2',
+        ])
+        self.assertEqual(list(spider.parse_archive(archive_response(2, known))), [])
+        self.assertEqual(spider.crawler.stats.get_value('zoomit/archive/links_known'), 5)
+
+    def test_backfill_is_decided_per_source(self):
+        # Another site has been crawled, so the table is not empty, but zoomit never has.
+        Frontier.mark_seen(['https://elsewhere.example/news/1/first'])
+        self.assertEqual(list(SeenURL.objects.values_list('source', flat=True)), [''])
+        frontier = Frontier('zoomit')
+        frontier.load()
+        self.assertTrue(frontier.backfill)
+        self.assertTrue(make_spider().backfill)
+
+        Frontier.mark_seen(['https://www.zoomit.ir/tech/20000-known/'])
+        self.assertEqual(SeenURL.objects.get(source='zoomit').fingerprint, url_fingerprint('https://zoomit.ir/tech/20000-known'))
+        self.assertFalse(make_spider().backfill)
+
+    def test_fixture_archive_schedules_each_article_once(self):
+        Frontier.mark_seen(['https://www.zoomit.ir/mobile/412370-iphone-launch/'])
+        spider = make_spider()
+        url = 'https://www.zoomit.ir/archive/?pageNumber=1'
+        response = HtmlResponse(
+            url=url, body=(FIXTURES_DIR / 'archive.html').read_bytes(), encoding='utf-8',
+            request=scrapy.Request(url, meta={'page_number': 1}),
+        )
+
+        requests = list(spider.parse_archive(response))
+        self.assertEqual([r.url for r in requests], [
+            'https://www.zoomit.ir/tech/412402-chip-shortage/',
+            'https://www.zoomit.ir/science/412401-mars-sample/',
+            'https://www.zoomit.ir/tech/412345-gemini-model/',
+            'https://www.zoomit.ir/archive/?pageNumber=2',
+        ])
+        stats = spider.crawler.stats
+        self.assertEqual(
+            [stats.get_value(f'zoomit/archive/links_{name}') for name in ('found', 'new', 'known', 'scheduled')],
+            [4, 3, 1, 3],
+        )
+
+        again = list(spider.parse_archive(response))
+        self.assertEqual(again, [])
+        self.assertEqual(stats.get_value('zoomit/archive/links_new'), 6)
+        self.assertEqual(stats.get_value('zoomit/archive/links_scheduled'), 3)
+
+    def test_empty_index_backfills_all_pages(self):
+        spider = make_spider(max_pages='3')
+        self.assertTrue(spider.backfill)
+        self.assertEqual([r.meta['page_number'] for r in spider.start_requests()], [1, 2, 3])
+        self.assertEqual(SeenURL.objects.count(), 0)
+
+
+class BatchedPipelineTests(TestCase):
+    def test_flush_persists_batch_with_constant_queries(self):
+        Tag.objects.create(name='AI', slug='ai')
+        items = [make_item(i, tags=['AI', ' Mobile ', '']) for i in range(30)]
+        items.append(make_item(0, tags=['AI']))
+
+        pipeline = BatchedDjangoNewsPipeline()
+        with self.assertNumQueries(15):
+            created = pipeline.flush_sync(items)
+
+        self.assertEqual(created, 30)
+        self.assertEqual(News.objects.count(), 30)
+        self.assertEqual(sorted(Tag.objects.values_list('slug', flat=True)), ['ai', 'mobile'])
+        self.assertEqual(News.tags.through.objects.count(), 60)
+        self.assertEqual(sorted(Tag.objects.values_list('slug', 'news_count')), [('ai', 30), ('mobile', 30)])
+        self.assertIn('news', News.objects.get(source=items[3]['source']).search_document)
+        self.assertEqual(News.objects.get(source=items[3]['source']).content_hash, News.hash_content('News 3', 'Content 3'))
+
+    def test_flush_skips_existing_sources(self):
+        pipeline = BatchedDjangoNewsPipeline()
+        pipeline.flush_sync([make_item(1)])
+        self.assertEqual(pipeline.flush_sync([make_item(1), make_item(2)]), 1)
+        self.assertEqual(News.objects.count(), 2)
+
+    def test_rows_inserted_concurrently_are_not_counted_as_created(self):
+        class RacingPipeline(BatchedDjangoNewsPipeline):
+            @staticmethod
+            def insert_news(news_objects):
+                News.objects.create(
+                    source=make_item(2)['source'], title='News 2', content='Content 2', published_at=timezone.now(),
+                )
+                return BatchedDjangoNewsPipeline.insert_news(news_objects)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            created = RacingPipeline().flush_sync([make_item(1, tags=['AI']), make_item(2, tags=['AI'])])
+
+        self.assertEqual(created, 1)
+        self.assertEqual(News.objects.count(), 2)
+        self.assertEqual(list(Tag.objects.values_list('slug', 'news_count')), [('ai', 1)])
+        self.assertFalse(News.objects.get(source=make_item(2)['source']).tags.exists())
+        self.assertEqual(NewsChange.objects.filter(news__source=make_item(2)['source']).count(), 1)
+
+    def test_invalid_items_are_skipped_without_losing_the_batch(self):
+        stats = MemoryStatsCollector(Crawler(ZoomitSpider))
+        pipeline = BatchedDjangoNewsPipeline(stats=stats)
+        undated = {**make_item(2), 'published_at': None}
+        self.assertEqual(pipeline.flush_sync([make_item(1), undated, make_item(3)]), 2)
+        self.assertEqual(sorted(News.objects.values_list('title', flat=True)), ['News 1', 'News 3'])
+        self.assertEqual(stats.get_value('news_pipeline/invalid_items'), 1)
+        self.assertFalse(SeenURL.objects.filter(fingerprint=url_fingerprint(undated['source'])).exists())
+
+    def test_items_are_buffered_until_batch_size(self):
+        flushed = []
+
+        class RecordingPipeline(BatchedDjangoNewsPipeline):
+            def flush_sync(self, items):
+                flushed.append(len(items))
+                return len(items)
+
+        async def run():
+            pipeline = RecordingPipeline(batch_size=3, flush_interval=0)
+            for i in range(7):
+                await pipeline.process_item(make_item(i), spider=None)
+            # Crawls run on the asyncio reactor, where close_spider's Deferred wraps a future on this loop.
+            loop = asyncio.get_running_loop()
+            with mock.patch('scrapy.utils.defer.is_asyncio_reactor_installed', return_value=True), \
+                    mock.patch('scrapy.utils.defer._get_asyncio_event_loop', return_value=loop):
+                closed = pipeline.close_spider(spider=None)
+            await closed.asFuture(loop)
+
+        asyncio.run(run())
+        self.assertEqual(flushed, [3, 3, 1])
+
+
+class BrowserServiceTests(TestCase):
+    def setUp(self):
+        handle, self.executable = tempfile.mkstemp(suffix='-chromium')
+        with os.fdopen(handle, 'w') as f:
+            f.write(FAKE_CHROMIUM.format(python=sys.executable))
+        os.chmod(self.executable, os.stat(self.executable).st_mode | stat.S_IEXEC)
+        self.service = BrowserService(executable_path=self.executable, max_pages=10, max_rss_mb=0)
+
+    def tearDown(self):
+        self.service.close()
+        os.remove(self.executable)
+
+    def test_browser_is_reused_between_runs(self):
+        cdp_url = self.service.acquire()
+        self.service.release(pages=3)
+        self.assertEqual(self.service.acquire(), cdp_url)
+        stats = self.service.stats()
+        self.assertEqual((stats['launches'], stats['reuses']), (1, 1))
+        self.assertGreater(stats['startup_seconds_saved'], 0)
+
+    def test_browser_is_recycled_after_max_pages(self):
+        self.service.acquire()
+        self.service.release(pages=10)
+        self.service.acquire()
+        self.assertEqual(self.service.stats()['recycles'], 1)
+        self.assertEqual(self.service.stats()['launches'], 2)
+
+    def test_dead_browser_is_relaunched(self):
+        self.service.acquire()
+        self.service.process.kill()
+        self.service.process.wait()
+        self.service.acquire()
+        self.assertTrue(self.service.is_healthy())
+        self.assertEqual(self.service.stats()['launches'], 2)
+
+
+class ZoomitArticleParsingTests(TestCase):
+    def setUp(self):
+        self.spider = make_spider()
+
+    def parse(self, response):
+        return list(self.spider.parse_news(response))
+
+    def test_static_dom_article(self):
+        [item] = self.parse(fixture_response('article.html'))
+        self.assertEqual(item['title'], 'گوگل مدل جدید جمنای را معرفی کرد')
+        self.assertEqual(item['tags'], ['هوش مصنوعی', 'گوگل'])
+        self.assertEqual(item['published_at'], datetime(2024, 12, 2, 14, 30))
+        self.assertIn('جمنای', item['content'])
+        self.assertIn('توسعه', item['content'])
+
+    def test_next_data_article(self):
+        [item] = self.parse(fixture_response('article_next_data.html'))
+        self.assertEqual(item['title'], 'اپل آیفون تازه را عرضه کرد')
+        self.assertEqual(item['tags'], ['اپل', 'موبایل'])
+        self.assertEqual(item['published_at'], datetime(2024, 12, 2, 14, 30))
+        self.assertEqual(item['content'], 'اپل نسل جدید آیفون را با تراشهی سریعتر معرفی کرد.\nفروش از جمعه آغاز میشود.')
+
+    def test_jalali_dates_accept_persian_and_latin_digits(self):
+        parse_jalali_datetime.cache_clear()
+        expected = datetime(2024, 12, 2, 14, 30)
+        self.assertEqual(parse_jalali_datetime('دوشنبه ۱۲ آذر ۱۴۰۳ - ۱۴:۳۰'), expected)
+        self.assertEqual(parse_jalali_datetime('12 آذر 1403 - 14:30'), expected)
+        self.assertEqual(parse_jalali_datetime('۱۲ آذر ۱۴۰۳'), datetime(2024, 12, 2))
+        self.assertIsNone(parse_jalali_datetime('۱۲ Frimaire ۱۴۰۳'))
+        self.assertIsNone(parse_jalali_datetime('دیروز'))
+
+        self.assertIs(parse_jalali_datetime('دوشنبه ۱۲ آذر ۱۴۰۳ - ۱۴:۳۰'), parse_jalali_datetime('دوشنبه ۱۲ آذر ۱۴۰۳ - ۱۴:۳۰'))
+        self.assertEqual(parse_jalali_datetime.cache_info().hits, 2)
+
+    def test_compiled_selectors_match_parsel(self):
+        response = fixture_response('article.html')
+        source = self.spider.source
+        for name, expr in source.selectors.items():
+            self.assertEqual(xpath_texts(source.xpaths[name], response), response.xpath(expr).getall())
+
+    def test_empty_static_page_falls_back_to_browser(self):
+        request = self.spider.article_request('https://www.zoomit.ir/tech/412345-fixture/')
+        self.assertFalse(request.meta['playwright'])
+        response = HtmlResponse(url=request.url, body=b'<html><body><div id="__next"></div></body></html>', request=request)
+        [retry] = self.parse(response)
+        self.assertTrue(retry.meta['playwright'])
+        self.assertTrue(retry.dont_filter)
+        self.assertEqual(self.spider.crawler.stats.get_value('zoomit/articles/browser_fallback'), 1)
+
+
+class RevalidationTests(TestCase):
+    url = 'https://www.zoomit.ir/tech/412345-fixture/'
+
+    def setUp(self):
+        item = list(make_spider().parse_news(fixture_response('article.html', self.url)))[0]
+        self.news = News.objects.create(
+            title=item['title'],
+            content=item['content'],
+            source=self.url,
+            published_at=timezone.now() - timedelta(days=1),
+            etag='"v1"',
+            last_modified='Mon, 02 Dec 2024 11:00:00 GMT',
+        )
+        News.objects.create(title='Old', content='Old', source='https://www.zoomit.ir/tech/10001-old/',
+                            published_at=timezone.now() - timedelta(days=30))
+        News.objects.create(title='Older recent', content='x', source='https://www.zoomit.ir/tech/10002-x/',
+                            published_at=timezone.now() - timedelta(days=2))
+        self.spider = make_spider(ZoomitRevalidateSpider, budget='1')
+
+    def response(self, status=200, body=None, headers=None):
+        request = self.spider.revalidation_request(self.spider.candidates[0])
+        if body is None:
+            body = (FIXTURES_DIR / 'article.html').read_bytes()
+        return HtmlResponse(url=self.url, status=status, body=body, encoding='utf-8', headers=headers, request=request)
+
+    def test_budget_limits_candidates_to_newest(self):
+        self.assertEqual([news['id'] for news in self.spider.candidates], [self.news.id])
+        self.assertEqual(self.spider.over_budget, 1)
+        request = list(self.spider.start_requests())[0]
+        self.assertEqual(request.headers['If-None-Match'], b'"v1"')
+        self.assertEqual(request.headers['If-Modified-Since'], b'Mon, 02 Dec 2024 11:00:00 GMT')
+        self.assertEqual(request.meta['handle_httpstatus_list'], [304])
+
+    def test_not_modified_and_unchanged_responses_write_nothing(self):
+        self.assertEqual(list(self.spider.parse_revalidation(self.response(status=304, body=b''))), [])
+        self.assertEqual(list(self.spider.parse_revalidation(self.response())), [])
+        self.spider.closed('finished')
+
+        stats = self.spider.crawler.stats
+        self.assertEqual(stats.get_value('revalidate/fetches_saved'), 1)
+        self.assertEqual(stats.get_value('revalidate/writes_saved'), 2)
+        self.assertIsNone(stats.get_value('revalidate/changed'))
+
+    def test_unchanged_article_with_new_validators_stores_only_them(self):
+        [item] = self.spider.parse_revalidation(self.response(headers={'ETag': '"v2"'}))
+        self.assertEqual(item, {'source': self.url, 'news_id': self.news.id, 'validators': {'etag': '"v2"'}})
+        updated_at = self.news.updated_at
+
+        with self.assertNumQueries(1):
+            RevalidationPipeline().process_item_sync(item)
+        self.news.refresh_from_db()
+        self.assertEqual((self.news.etag, self.news.last_modified), ('"v2"', 'Mon, 02 Dec 2024 11:00:00 GMT'))
+        self.assertEqual(self.news.updated_at, updated_at)
+        self.assertEqual(self.spider.crawler.stats.get_value('revalidate/validators_refreshed'), 1)
+
+    def test_changed_article_is_rewritten(self):
+        body = (FIXTURES_DIR / 'article.html').read_text().replace('جمنای', 'جمنای ۲').encode()
+        [item] = self.spider.parse_revalidation(self.response(body=body, headers={'ETag': '"v2"'}))
+        self.assertEqual(item['news_id'], self.news.id)
+        updated_at = self.news.updated_at
+
+        RevalidationPipeline().process_item_sync(item)
+        self.news.refresh_from_db()
+        self.assertIn('جمنای ۲', self.news.content)
+        self.assertEqual(self.news.etag, '"v2"')
+        self.assertEqual(self.news.content_hash, News.hash_content(item['title'], item['content']))
+        self.assertGreater(self.news.updated_at, updated_at)
+        self.assertCountEqual(self.news.tags.values_list('name', flat=True), ['گوگل', 'هوش مصنوعی'])
+
+
+MOCK_SOURCE = NewsSource(
+    name='mocktech',
+    base_url='https://mocktech.example',
+    archive_path='/news/page/{page}/',
+    article_path=r'^/news/\d+/[a-z-]+$',
+    selectors={
+        'title': '//article/h2/text()',
+        'content': '//article/div[@class="body"]//p/text()',
+        'published_at': '//article/time/@datetime',
+        'tags': '//article/ul[@class="tags"]/li/text()',
+    },
+    date_parser='scraper.extractors.parse_iso_datetime',
+    render_archive=False,
+    queue='scraping-slow',
+    min_interval=300,
+)
+
+
+class SourceRegistryTests(TestCase):
+    def setUp(self):
+        register(MOCK_SOURCE)
+        self.addCleanup(SOURCES.pop, MOCK_SOURCE.name)
+
+    def test_unknown_source_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_source('nope')
+
+    def test_spider_follows_source_declaration(self):
+        spider = make_spider(NewsSpider, source='mocktech')
+        request = spider.archive_request(2)
+        self.assertEqual(request.url, 'https://mocktech.example/news/page/2/')
+        self.assertFalse(request.meta['playwright'])
+        self.assertEqual(request.meta['download_slot'], 'mocktech-http')
+        self.assertIn('mocktech-http', spider.settings.getdict('DOWNLOAD_SLOTS'))
+
+        archive = HtmlResponse(
+            url=request.url, request=request, encoding='utf-8',
+            body=b'<a href="/news/42/new-phone">x</a><a href="https://www.zoomit.ir/news/43/other">x</a>'
+                 b'<a href="/news/tag/phones">x</a>',
+        )
+        [article] = spider.parse_archive(archive)
+        self.assertEqual(article.url, 'https://mocktech.example/news/42/new-phone')
+
+        page = HtmlResponse(
+            url=article.url, request=article, encoding='utf-8',
+            body='<article><h2>Phone</h2><time datetime="2025-01-01T08:30:00Z"></time>'
+                 '<div class="body"><p>One</p><p>Two</p></div><ul class="tags"><li>Mobile</li></ul></article>'.encode(),
+        )
+        [item] = spider.parse_news(page)
+        self.assertEqual((item['title'], item['content'], item['tags']), ('Phone', 'One\nTwo', ['Mobile']))
+        self.assertEqual(item['published_at'], datetime(2025, 1, 1, 12, 0))
+        self.assertEqual(spider.crawler.stats.get_value('mocktech/articles/dom'), 1)
+
+    @override_settings(SCRAPER_SOURCES=['zoomit', 'mocktech'])
+    def test_beat_fans_out_one_task_per_source_queue(self):
+        from news.tasks import scrape_news_task, scrape_sources_task
+
+        with mock.patch.object(scrape_news_task, 'apply_async') as apply_async:
+            self.assertEqual(scrape_sources_task(), ['zoomit', 'mocktech'])
+        self.assertEqual(apply_async.call_args_list, [
+            mock.call(kwargs={'source': 'zoomit'}, queue='scraping'),
+            mock.call(kwargs={'source': 'mocktech'}, queue='scraping-slow'),
+        ])
+
+
+class CrawlerWorkerTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_startup_timer_records_time_to_spider_open(self):
+        crawler = Crawler(NewsSpider, {'CRAWL_STARTED_AT': time.time() - 2})
+        crawler.stats = MemoryStatsCollector(crawler)
+        StartupTimer.from_crawler(crawler).spider_opened(None)
+        self.assertGreaterEqual(crawler.stats.get_value('crawl/startup_seconds'), 2)
+
+        with self.assertRaises(NotConfigured):
+            StartupTimer.from_crawler(Crawler(NewsSpider))
+
+    def test_beats_enqueue_one_job_per_due_source(self):
+        from news.tasks import enqueue_crawl
+
+        scheduler = ScrapeScheduler.for_source(get_source('zoomit'))
+        with mock.patch('news.tasks.crawl_queue.enqueue', side_effect=['job-1', None]) as enqueue:
+            self.assertEqual(enqueue_crawl(scheduler, get_source('zoomit')), {'status': 'queued', 'job_id': 'job-1'})
+            self.assertEqual(enqueue_crawl(scheduler, get_source('zoomit'))['reason'], 'already_queued')
+            scheduler.record({'crawl/startup_seconds': 0.01}, 1.0)
+            self.assertEqual(enqueue_crawl(scheduler, get_source('zoomit'))['reason'], 'not_due')
+        self.assertEqual(enqueue.call_count, 2)
+
+    def test_beats_for_a_running_source_are_coalesced_not_queued(self):
+        from news.tasks import enqueue_crawl
+
+        caches['default'].clear()
+        scheduler = ScrapeScheduler.for_source(get_source('zoomit'))
+        lock = scheduler.lock()
+        self.assertTrue(lock.acquire())
+        with mock.patch('news.tasks.crawl_queue.enqueue') as enqueue:
+            self.assertEqual(enqueue_crawl(scheduler, get_source('zoomit'))['reason'], 'running')
+            self.assertEqual(enqueue_crawl(scheduler, get_source('zoomit'))['coalesced'], 2)
+        enqueue.assert_not_called()
+        self.assertEqual(scheduler.settle({}), {'coalesced': 2, 'follow_up': True})
+        lock.release()
+
+    @skipUnless(redis_available('redis://localhost:6379/15'), 'needs a Redis server')
+    def test_queue_coalesces_jobs_per_source(self):
+        queue = CrawlQueue('redis://localhost:6379/15', prefix='crawl-test')
+        self.addCleanup(queue.client.delete, queue.key('jobs'), queue.key('queued'))
+        job_id = queue.enqueue('zoomit', max_pages=2)
+        self.assertIsNone(queue.enqueue('zoomit'))
+        self.assertEqual(queue.size(), 1)
+
+        job = queue.pop(timeout=1)
+        self.assertEqual((job['id'], job['source'], job['options']), (job_id, 'zoomit', {'max_pages': 2}))
+        self.assertIsNotNone(queue.enqueue('zoomit'))
+        queue.store_result(job_id, {'status': 'completed'})
+        self.assertEqual(queue.result(job_id), {'status': 'completed'})
+        self.addCleanup(queue.client.delete, queue.key(f'result:{job_id}'))
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = type('FakeRequest', (), {'resource_type': resource_type, 'url': url})()
+        self.action = None
+
+    async def continue_(self):
+        self.action = 'continue'
+
+    async def abort(self, error_code=None):
+        self.action = 'abort'
+
+
+class FakePage:
+    def __init__(self):
+        self.handlers = {}
+
+    async def route(self, pattern, handler):
+        self.route_handler = handler
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+
+class ResourceBlockingTests(TestCase):
+    def test_policy_blocks_heavy_and_third_party_resources(self):
+        policy = ResourcePolicy(allowed_domains=['zoomit.ir'])
+        self.assertIsNone(policy.block_reason('document', 'https://www.zoomit.ir/archive/'))
+        self.assertIsNone(policy.block_reason('script', 'https://static.zoomit.ir/app.js'))
+        self.assertEqual(policy.block_reason('image', 'https://api2.zoomit.ir/cover.jpg'), 'image')
+        self.assertEqual(policy.block_reason('stylesheet', 'https://www.zoomit.ir/main.css'), 'stylesheet')
+        self.assertEqual(policy.block_reason('script', 'https://www.googletagmanager.com/gtag/js'), 'third_party')
+
+    def test_archive_requests_use_policy_and_dom_wait(self):
+        request = make_spider().archive_request(2)
+        self.assertEqual(request.meta['playwright_page_goto_kwargs'], {'wait_until': 'domcontentloaded'})
+        self.assertEqual(request.meta['playwright_page_init_callback'], 'scraper.resources.init_page')
+        self.assertIsInstance(request.meta['resource_policy'], ResourcePolicy)
+
+    def test_init_page_counts_blocked_requests(self):
+        request = scrapy.Request('https://www.zoomit.ir/archive/', meta={
+            'resource_policy': ResourcePolicy(allowed_domains=['zoomit.ir']),
+        })
+        page = FakePage()
+        routes = [
+            FakeRoute('document', 'https://www.zoomit.ir/archive/'),
+            FakeRoute('image', 'https://api2.zoomit.ir/a.jpg'),
+            FakeRoute('font', 'https://www.zoomit.ir/a.woff2'),
+            FakeRoute('script', 'https://ads.example.com/ad.js'),
+        ]
+
+        async def run():
+            await init_page(page, request)
+            for route in routes:
+                await page.route_handler(route)
+
+        asyncio.run(run())
+        self.assertEqual([route.action for route in routes], ['continue', 'abort', 'abort', 'abort'])
+        stats = request.meta['resource_stats']
+        self.assertEqual((stats['allowed'], stats['blocked']), (1, 3))
+        self.assertEqual(stats['reasons'], {'image': 1, 'font': 1, 'third_party': 1})
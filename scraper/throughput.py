@@ -0,0 +1,80 @@
+BACKOFF_HTTP_CODES = [429, 500, 502, 503, 504]
+
+THROUGHPUT_PROFILES = {
+    # The old hard-coded behaviour: one request at a time, one second apart.
+    'polite': {
+        'browser_concurrency': 1,
+        'http_concurrency': 1,
+        'min_delay': 1.0,
+        'max_delay': 30.0,
+        'target_concurrency': 1.0,
+    },
+    'balanced': {
+        'browser_concurrency': 2,
+        'http_concurrency': 4,
+        'min_delay': 0.25,
+        'max_delay': 15.0,
+        'target_concurrency': 2.0,
+    },
+    'fast': {
+        'browser_concurrency': 3,
+        'http_concurrency': 8,
+        'min_delay': 0.0,
+        'max_delay': 10.0,
+        'target_concurrency': 4.0,
+    },
+}
+DEFAULT_PROFILE = 'balanced'
+
+
+def browser_slot(source_name):
+    return f'{source_name}-browser'
+
+
+def http_slot(source_name):
+    return f'{source_name}-http'
+
+
+def throughput_options(profile=None, **overrides):
+    profile = profile or DEFAULT_PROFILE
+    if profile not in THROUGHPUT_PROFILES:
+        raise ValueError(f"profile must be one of {tuple(THROUGHPUT_PROFILES)}, got {profile!r}")
+    options = dict(THROUGHPUT_PROFILES[profile])
+    for key, value in overrides.items():
+        if key not in options:
+            raise TypeError(f"Unknown throughput option {key!r}")
+        if value is not None:
+            options[key] = type(options[key])(value)
+    if options['browser_concurrency'] < 1 or options['http_concurrency'] < 1:
+        raise ValueError("Concurrency limits must be at least 1")
+    if options['min_delay'] > options['max_delay']:
+        raise ValueError("min_delay must not exceed max_delay")
+    return options
+
+
+def throughput_settings(source_name, profile=None, **overrides):
+    """Scrapy settings for crawling ``source_name`` with a throughput profile.
+
+    Browser-rendered and plain requests to the source get their own
+    download slot, each with its own concurrency cap. AutoThrottle moves every slot's delay
+    between ``min_delay`` and ``max_delay`` from observed latency, and
+    ``BackoffMiddleware`` widens it on 429/5xx responses.
+    """
+    options = throughput_options(profile, **overrides)
+    browser, http = options['browser_concurrency'], options['http_concurrency']
+    return {
+        'AUTOTHROTTLE_ENABLED': True,
+        'AUTOTHROTTLE_START_DELAY': options['min_delay'],
+        'AUTOTHROTTLE_MAX_DELAY': options['max_delay'],
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': options['target_concurrency'],
+        'DOWNLOAD_DELAY': options['min_delay'],
+        'RANDOMIZE_DOWNLOAD_DELAY': False,
+        'CONCURRENT_REQUESTS': browser + http,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': browser + http,
+        'DOWNLOAD_SLOTS': {
+            browser_slot(source_name): {'concurrency': browser, 'delay': options['min_delay']},
+            http_slot(source_name): {'concurrency': http, 'delay': options['min_delay']},
+        },
+        'PLAYWRIGHT_MAX_PAGES_PER_CONTEXT': browser,
+        'BACKOFF_HTTP_CODES': BACKOFF_HTTP_CODES,
+    }